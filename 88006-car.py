@@ -1,14 +1,24 @@
 from pybricks.hubs import MoveHub
-from pybricks.pupdevices import Motor, Remote
+from pybricks.pupdevices import Motor
 from pybricks.parameters import Port, Button, Color
-from pybricks.tools import wait
+from pybricks.tools import wait, StopWatch
 
-# Initialize the hub
+from hubstore import HubStore, center_steering
+from motor_group import MotorGroup
+from remote_session import RemoteSession
+from stall_monitor import StallMonitor, REDUCE
+
+boot = StopWatch()
+
+# Initialize the hub and load cached calibration / pairing
 hub = MoveHub()
+store = HubStore(hub)
+store.load()
 
 # Drive motors (internal A+B)
 motor_a = Motor(Port.A)
 motor_b = Motor(Port.B)
+drive = MotorGroup([motor_a, motor_b])  # A and B always change together
 
 # Steering motor (external D) — optional
 try:
@@ -16,15 +26,24 @@ try:
 except OSError:
     steering = None
 
-# Reset steering to known center position
+# Reset steering to known center position (cached after first boot)
+if steering:
+    center_steering(steering, store)
+
+# Steering held against its end stop drops to a low holding duty.
+stalls = StallMonitor(hub)
 if steering:
-    steering.reset_angle(0)
+    stalls.register(steering, "steering", REDUCE)
 
-# Wait for the remote to connect
+# Wait for the remote to connect (cached remote is tried first).
+# If it drops later, the drive and steering motors are stopped and the
+# remote is reconnected while the loop keeps running.
 hub.light.on(Color.ORANGE)
-remote = Remote(timeout=None)
+remote = RemoteSession(store, [motor_a, motor_b] + ([steering] if steering else []),
+                       failsafe=drive.invalidate)
+remote.connect()
 hub.light.on(Color.GREEN)
-wait(500)
+print("Time to first drive:", boot.time(), "ms")
 
 DRIVE_SPEED = 1000   # degrees per second for drive motors
 STEER_SPEED = 200    # degrees per second for steering — do not change this angle
@@ -32,43 +51,43 @@ STEER_SPEED = 200    # degrees per second for steering — do not change this an
 was_steering = False
 
 while True:
-    pressed = remote.buttons.pressed()
+    pressed = remote.pressed()
 
     # CENTER button → emergency stop
     if Button.CENTER in pressed:
-        motor_a.stop()
-        motor_b.stop()
+        drive.stop()
         if steering:
-            steering.stop()
+            stalls.stop(steering)
         hub.light.on(Color.RED)
-        remote.light.on(Color.RED)
+        remote.light(Color.RED)
         wait(50)
         continue
 
     # LEFT +/−: drive forward / backward
     if Button.LEFT_PLUS in pressed:
-        motor_a.run(DRIVE_SPEED)
-        motor_b.run(-DRIVE_SPEED)
+        drive.run((DRIVE_SPEED, -DRIVE_SPEED))
     elif Button.LEFT_MINUS in pressed:
-        motor_a.run(-DRIVE_SPEED)
-        motor_b.run(DRIVE_SPEED)
+        drive.run((-DRIVE_SPEED, DRIVE_SPEED))
     else:
-        motor_a.stop()
-        motor_b.stop()
+        drive.stop()
 
     # RIGHT +/−: steering on port D, auto-return to center on release
     is_steering = Button.RIGHT_PLUS in pressed or Button.RIGHT_MINUS in pressed
     if steering:
         if Button.RIGHT_PLUS in pressed:
-            steering.run(STEER_SPEED)
+            stalls.run(steering, STEER_SPEED)
         elif Button.RIGHT_MINUS in pressed:
-            steering.run(-STEER_SPEED)
+            stalls.run(steering, -STEER_SPEED)
         elif was_steering:
+            stalls.clear(steering)
             steering.run_target(STEER_SPEED, 0)  # return to center — do not change steering angle
+        stalls.update()
     was_steering = is_steering
 
-    # Hub light feedback (drive buttons only)
-    if Button.LEFT_PLUS in pressed:
+    # Hub light feedback (drive buttons only), orange while reconnecting
+    if not remote.connected:
+        hub.light.on(Color.ORANGE)
+    elif Button.LEFT_PLUS in pressed:
         hub.light.on(Color.GREEN)
     elif Button.LEFT_MINUS in pressed:
         hub.light.on(Color.ORANGE)
@@ -0,0 +1,293 @@
+# Slip-aware acceleration for DriveBase maneuvers.
+#
+# Instead of one hand-tuned straight_acceleration / turn_acceleration, each
+# maneuver watches the acceleration phase. The wheel encoders cannot tell a
+# slip: the DriveBase makes them follow the ramp whether the robot moves or
+# not. So the checks use what the body of the robot does:
+#   - straights: the hub accelerometer along forward_axis, averaged over the
+#     ramp, against the commanded acceleration
+#   - turns, with a GyroHeading: the measured rotation against the rotation
+#     the motor angles add up to (robot.angle() will not do: with use_gyro
+#     it is the gyro heading itself)
+#   - motor load collapsing while still accelerating means grip was lost
+# After a slip the acceleration for that kind of move is backed off. It is
+# only raised after CLEAN_RUNS moves in a row with the body keeping up, so
+# without an accelerometer or gyro it never goes up, only down. The learned
+# values are kept per surface in the hub store, so the next run starts
+# where this one ended.
+#
+# With a GyroHeading (see gyro_drive.py) turns end on the measured heading
+# and the worst heading error after a turn, once the robot is at rest, is
+# kept in max_heading_error.
+#
+# arc() runs a DriveBase curve through the same checks, for path_executor.py.
+# It ends on the measured heading too, and slip is the rotation falling
+# behind the wheels (gyro) or the sideways acceleration falling behind
+# speed^2 / radius (accelerometer). The speed can only be changed at a
+# standstill, so after a slip the robot stops at the end of the arc and the
+# drive speed or turn rate, whichever limits the arc, is backed off for the
+# rest of the run.
+#
+# Integer math only outside the gyro path, so this also runs on the Move Hub.
+
+from pybricks.parameters import Stop
+from pybricks.tools import wait, StopWatch
+
+SAMPLE_MS = 10
+
+GRIP_PCT = 70           # body must reach this share of the commanded motion
+MIN_SAMPLES = 3         # fewer accelerometer samples than this prove nothing
+LOAD_DROP_PCT = 50      # load below this share of its peak = lost grip
+ENTRY_MS = 100          # arc entry, speed still settling, not judged
+BACKOFF_PCT = 70        # new acceleration after a slip
+RAMP_UP_PCT = 110       # new acceleration after CLEAN_RUNS clean moves
+CLEAN_RUNS = 2
+
+STRAIGHT = 0
+TURN = 1
+
+
+def _isqrt(n):
+    if n <= 0:
+        return 0
+    x = n
+    y = (x + 1) // 2
+    while y < x:
+        x = y
+        y = (x + n // x) // 2
+    return x
+
+
+class AdaptiveDrive:
+    """DriveBase wrapper that learns the fastest acceleration without slip."""
+
+    def __init__(self, robot, left, right, store=None, surface=0,
+                 straight_speed=300, straight_acceleration=700,
+                 turn_rate=180, turn_acceleration=360,
+                 max_straight_acceleration=3000, max_turn_acceleration=2000,
+                 gyro=None, hub=None, forward_axis=0, wheel_diameter=None,
+                 axle_track=None, side_axis=1):
+        self.robot = robot
+        self.left = left
+        self.right = right
+        self.store = store
+        self.surface = surface
+        self.gyro = gyro
+        self.forward_axis = forward_axis
+        self.side_axis = side_axis
+        self.wheel_diameter = wheel_diameter
+        self.axle_track = axle_track
+        # Accelerometer, if the hub has one (all but the City Hub).
+        self.imu = hub.imu if hub and hasattr(hub, "imu") and hasattr(hub.imu, "acceleration") else None
+        self.speeds = [straight_speed, turn_rate]
+        self.min_speed = straight_speed // 4
+        self.maxima = (max_straight_acceleration, max_turn_acceleration)
+        self.minima = (straight_acceleration // 4, turn_acceleration // 4)
+        self.accel = [straight_acceleration, turn_acceleration]
+        self.clean = [0, 0]
+        self.slips = 0
+        self.max_heading_error = 0
+        self.peak_turn_rate = 0  # deg/s actually reached in turns
+
+        if store and store.accel_limits[surface]:
+            self.accel = list(store.accel_limits[surface])
+        self._apply()
+
+    def _apply(self):
+        self.robot.settings(
+            straight_speed=self.speeds[STRAIGHT],
+            straight_acceleration=self.accel[STRAIGHT],
+            turn_rate=self.speeds[TURN],
+            turn_acceleration=self.accel[TURN],
+        )
+
+    def _ramp_ms(self, kind, amount):
+        """Duration of the acceleration phase for a move of this size."""
+        accel = self.accel[kind]
+        cruise = self.speeds[kind]
+        amount = abs(amount)
+        if cruise * cruise <= accel * amount:
+            return 1000 * cruise // accel
+        # Short move: triangular profile, peak speed is reached halfway.
+        return _isqrt(1000000 * amount // accel)
+
+    def _wheel_turn(self):
+        """Robot rotation in degrees according to the motor angles."""
+        spin = self.left.angle() - self.right.angle()
+        return spin * self.wheel_diameter // (2 * self.axle_track)
+
+    def _forward(self):
+        return int(self.imu.acceleration()[self.forward_axis])
+
+    def _side(self):
+        return int(self.imu.acceleration()[self.side_axis])
+
+    def _learn(self, kind, slipped, gripped):
+        accel = self.accel[kind]
+        if slipped:
+            self.slips += 1
+            self.clean[kind] = 0
+            accel = max(self.minima[kind], accel * BACKOFF_PCT // 100)
+        elif not gripped:
+            # No evidence either way: keep the current value.
+            self.clean[kind] = 0
+        else:
+            self.clean[kind] += 1
+            if self.clean[kind] >= CLEAN_RUNS:
+                self.clean[kind] = 0
+                accel = min(self.maxima[kind], accel * RAMP_UP_PCT // 100)
+
+        if accel != self.accel[kind]:
+            self.accel[kind] = accel
+            self._apply()
+            if self.store:
+                self.store.accel_limits[self.surface] = tuple(self.accel)
+                self.store.dirty = True
+
+    def _run(self, kind, amount, check):
+        accel = self.accel[kind]
+        # Only judge the first part of the ramp; near the end the load drops
+        # naturally as the speed levels off.
+        window = self._ramp_ms(kind, amount) * 4 // 5
+
+        target = None
+        if kind == STRAIGHT:
+            judge = self.imu is not None  # can the body's motion be checked?
+            if judge:
+                rest = self._forward()  # gravity and mounting offset
+                sensed = 0
+                samples = 0
+            self.robot.straight(amount, wait=False)
+        else:
+            judge = self.gyro is not None and self.axle_track is not None
+            if self.gyro:
+                start_heading = self.gyro.heading()
+                start_angle = self._wheel_turn() if judge else 0
+                target = start_heading + amount
+                direction = 1 if amount > 0 else -1
+            self.robot.turn(amount, wait=False)
+
+        timer = StopWatch()
+        peak = 0
+        slipped = False
+        gripped = False
+        while not self.robot.done():
+            if check and check():
+                self.robot.stop()
+                return False
+
+            if target is not None and self.gyro.reached(target, direction):
+                # On heading: end the turn instead of settling an overshoot.
+                self.robot.brake()
+                break
+
+            if kind == TURN:
+                rate = abs(self.robot.state()[3])
+                if rate > self.peak_turn_rate:
+                    self.peak_turn_rate = rate
+
+            t = timer.time()
+            if not slipped and t < window:
+                load = abs(self.left.load()) + abs(self.right.load())
+                peak = max(peak, load)
+                if t > 4 * SAMPLE_MS and load * 100 < peak * LOAD_DROP_PCT:
+                    slipped = True
+                if judge and kind == STRAIGHT:
+                    sensed += abs(self._forward() - rest)
+                    samples += 1
+            elif judge and not slipped:
+                # End of the ramp: did the body follow the wheels?
+                judge = False
+                if kind == STRAIGHT:
+                    if samples >= MIN_SAMPLES:
+                        slipped = sensed // samples * 100 < accel * GRIP_PCT
+                        gripped = not slipped
+                else:
+                    turned = abs(self.gyro.heading() - start_heading)
+                    wheels = abs(self._wheel_turn() - start_angle)
+                    slipped = turned * 100 < wheels * GRIP_PCT
+                    gripped = not slipped
+
+            wait(SAMPLE_MS)
+
+        if target is not None:
+            # Measure once the robot is at rest, so any overshoot after the
+            # brake is included.
+            self.gyro.settle()
+            error = abs(self.gyro.heading() - target)
+            if error > self.max_heading_error:
+                self.max_heading_error = error
+
+        self._learn(kind, slipped, gripped)
+        return True
+
+    def straight(self, distance, check=None):
+        """Drive straight. Returns False if check() returned True on the way."""
+        return self._run(STRAIGHT, distance, check)
+
+    def turn(self, angle, check=None):
+        """Turn in place. Returns False if check() returned True on the way."""
+        return self._run(TURN, angle, check)
+
+    def arc(self, radius, angle, then=Stop.NONE, check=None):
+        """Drive a curve, by default carrying the speed into the next move.
+
+        Returns False if check() returned True on the way.
+        """
+        # curve() runs at the straight speed unless the turn rate limits it.
+        speed = min(self.speeds[STRAIGHT], self.speeds[TURN] * radius * 314 // 18000)
+        by_gyro = self.gyro is not None and self.axle_track is not None
+        by_imu = not by_gyro and self.imu is not None
+
+        target = None
+        if self.gyro:
+            start_heading = self.gyro.heading()
+            start_angle = self._wheel_turn() if by_gyro else 0
+            target = start_heading + angle
+            direction = 1 if angle > 0 else -1
+        if by_imu:
+            rest = self._side()
+            sensed = 0
+            samples = 0
+        self.robot.curve(radius, angle, then=then, wait=False)
+
+        timer = StopWatch()
+        while not self.robot.done():
+            if check and check():
+                self.robot.stop()
+                return False
+
+            if then == Stop.NONE and target is not None and self.gyro.reached(target, direction):
+                # On heading: hand over to the next move right away.
+                break
+
+            if by_imu and timer.time() > ENTRY_MS:
+                sensed += abs(self._side() - rest)
+                samples += 1
+
+            wait(SAMPLE_MS)
+
+        slipped = False
+        if by_gyro:
+            turned = abs(self.gyro.heading() - start_heading)
+            wheels = abs(self._wheel_turn() - start_angle)
+            slipped = turned * 100 < wheels * GRIP_PCT
+        elif by_imu and samples >= MIN_SAMPLES:
+            slipped = sensed // samples * 100 < speed * speed // radius * GRIP_PCT
+
+        if slipped:
+            # Lower whichever limit set the arc speed.
+            self.slips += 1
+            self.robot.stop()
+            speed = max(self.min_speed, speed * BACKOFF_PCT // 100)
+            if speed < self.speeds[STRAIGHT]:
+                self.speeds[TURN] = max(1, speed * 18000 // (314 * radius))
+            else:
+                self.speeds[STRAIGHT] = speed
+            self._apply()
+        return True
+
+    def save(self):
+        """Write the learned accelerations to the hub store."""
+        if self.store:
+            self.store.save()
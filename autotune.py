@@ -0,0 +1,176 @@
+# Parameter sweep for movehub-square-drive.py on top of square_sim.py.
+#
+# Runs on a PC, not on the hub:
+#
+#   python autotune.py --mode random --runs 4000
+#   python autotune.py --mode grid --workers 8 --top 20
+#   python autotune.py --corners stop        only stop-and-turn corners
+#   python autotune.py --gyro                 also gyro turns (Technic Hub)
+#
+# Every configuration is run against the same set of scenarios (floors with
+# different grip, with and without a white patch). Each (configuration,
+# scenario) pair is one job for the process pool. Configurations are
+# ranked by their mean score (time + weighted path error + weighted energy)
+# and the best one is printed in the form the script uses.
+#
+# The script is written for the Move Hub, which has no gyro, so gyro turns
+# are only swept with --gyro. The accelerations found are starting values:
+# AdaptiveDrive adjusts them while driving and keeps what it learned per
+# SURFACE in the hub store, which then wins over the values in the script.
+# Use a SURFACE slot with nothing learned yet to try them.
+#
+# Only the square drive is modelled. STEER_SPEED and STEER_ANGLE of the car
+# scripts are not swept: those cars are driven by hand from the remote, so
+# there is no route to score them on.
+
+import argparse
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from square_sim import Config, Scenario, run
+
+# (low, high, grid step) per constant. "gyro" and "blended" are choices;
+# corner_radius only matters for blended corners.
+SPACE = {
+    "straight_speed": (150, 600, 50),
+    "straight_acceleration": (300, 2500, 200),
+    "turn_rate": (90, 720, 90),
+    "turn_acceleration": (180, 1800, 180),
+    "clear_mm": (20, 100, 10),
+}
+CORNER_RADIUS = (40, 160, 40)
+GYRO_CHOICES = (False, True)
+BLENDED_CHOICES = (False, True)
+
+
+def scenarios(count, seed):
+    """Fixed set of floors and patches so every configuration sees the same runs."""
+    rng = random.Random(seed)
+    result = []
+    for i in range(count):
+        grip = rng.choice((500, 800, 1200, 2000))
+        if i % 2:
+            result.append(Scenario(grip=grip, white_side=rng.randrange(4),
+                                   white_at_mm=rng.randrange(30, 220),
+                                   white_depth_mm=rng.randrange(40, 120)))
+        else:
+            result.append(Scenario(grip=grip))
+    return result
+
+
+def grid_configs(gyro, blended):
+    axes = [range(lo, hi + 1, step) for lo, hi, step in SPACE.values()]
+    lo, hi, step = CORNER_RADIUS
+    radii = range(lo, hi + 1, step)
+    for values in itertools.product(*axes, gyro):
+        if False in blended:
+            yield Config(*values)
+        if True in blended:
+            for radius in radii:
+                yield Config(*values, blended=True, corner_radius=radius)
+
+
+def random_configs(runs, gyro, blended, seed):
+    rng = random.Random(seed)
+    lo, hi, step = CORNER_RADIUS
+    for _ in range(runs):
+        values = [rng.randrange(lo_, hi_ + 1, step_) for lo_, hi_, step_ in SPACE.values()]
+        yield Config(*values, gyro=rng.choice(gyro), blended=rng.choice(blended),
+                     corner_radius=rng.randrange(lo, hi + 1, step))
+
+
+def _shown(config):
+    """The constants that matter for this configuration."""
+    values = config.as_dict()
+    del values["gyro"]  # shown in its own column
+    if not config.blended:
+        del values["corner_radius"]  # unused by stop-and-turn corners
+    return values
+
+
+def _print_best(config):
+    """Print config the way movehub-square-drive.py spells it."""
+    if config.gyro:
+        print("# Technic Hub only: turn values go in the has_gyro(hub) branch")
+    print("drive = AdaptiveDrive(..., straight_speed=%d, straight_acceleration=%d, ...)"
+          % (config.straight_speed, config.straight_acceleration))
+    print("turn_rate = %d" % config.turn_rate)
+    print("turn_acceleration = %d" % config.turn_acceleration)
+    print("CLEAR_MM = %d" % config.clear_mm)
+    print("BLENDED = %r" % config.blended)
+    if config.blended:
+        print("CORNER_RADIUS = %d" % config.corner_radius)
+    print("# Accelerations are AdaptiveDrive starting values; learned limits")
+    print("# in the hub store for the chosen SURFACE take precedence.")
+
+
+def _job(args):
+    index, config, scenario, weights = args
+    result = run(config, scenario)
+    return index, result.score(*weights), result.time_s, result.path_error_mm, result.energy_j
+
+
+def sweep(configs, scenes, weights, workers):
+    configs = list(configs)
+    totals = [[0.0, 0.0, 0.0, 0.0] for _ in configs]
+    jobs = ((i, c, s, weights) for i, c in enumerate(configs) for s in scenes)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for index, score, time_s, error, energy in pool.map(_job, jobs, chunksize=256):
+            total = totals[index]
+            total[0] += score
+            total[1] += time_s
+            total[2] += error
+            total[3] += energy
+
+    n = len(scenes)
+    ranked = sorted(
+        ((t[0] / n, t[1] / n, t[2] / n, t[3] / n, c) for t, c in zip(totals, configs)),
+        key=lambda row: row[0],
+    )
+    return ranked
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep square drive constants in simulation.")
+    parser.add_argument("--mode", choices=("grid", "random"), default="random")
+    parser.add_argument("--runs", type=int, default=2000, help="configurations for --mode random")
+    parser.add_argument("--scenarios", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--gyro", action="store_true",
+                        help="also sweep gyro turns (Technic Hub only)")
+    parser.add_argument("--corners", choices=("both", "stop", "blended"), default="both",
+                        help="corner styles to sweep")
+    parser.add_argument("--w-time", type=float, default=1.0)
+    parser.add_argument("--w-error", type=float, default=0.05)
+    parser.add_argument("--w-energy", type=float, default=0.2)
+    args = parser.parse_args()
+
+    gyro = GYRO_CHOICES if args.gyro else (False,)
+    blended = {"both": BLENDED_CHOICES, "stop": (False,), "blended": (True,)}[args.corners]
+    if args.mode == "grid":
+        configs = grid_configs(gyro, blended)
+    else:
+        configs = random_configs(args.runs, gyro, blended, args.seed)
+
+    scenes = scenarios(args.scenarios, args.seed)
+    weights = (args.w_time, args.w_error, args.w_energy)
+    ranked = sweep(configs, scenes, weights, args.workers)
+
+    print("%4s %8s %7s %8s %8s %-8s %s" % ("rank", "score", "time s", "err mm", "energy J",
+                                           "gyro", "config"))
+    for rank, (score, time_s, error, energy, config) in enumerate(ranked[:args.top], 1):
+        print("%4d %8.2f %7.2f %8.1f %8.2f %-8s %s" % (
+            rank, score, time_s, error, energy, "Technic" if config.gyro else "-",
+            _shown(config)))
+
+    print()
+    print("# Best of", len(ranked), "configurations x", len(scenes), "scenarios:")
+    _print_best(ranked[0][4])
+
+
+if __name__ == "__main__":
+    main()
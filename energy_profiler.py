@@ -0,0 +1,102 @@
+# Per-actuator energy accounting from battery telemetry.
+#
+# Samples hub.battery.current() and voltage() at a fixed rate. The program
+# tells the profiler which actuators are on (set()) and which mode it is in
+# (mode()). Each sample is split as follows:
+#   - the hub's own idle draw, learned while nothing is on, goes to "idle"
+#   - the rest is shared equally by the actuators that are on at that moment
+#   - the whole sample also counts toward the current mode
+# report() prints the session totals in mWh.
+#
+# Totals are kept as whole mJ plus a uJ remainder, so they stay small
+# integers even on the Move Hub.
+
+from pybricks.tools import StopWatch
+
+PERIOD_MS = 100
+REPORT_MS = 60000
+
+
+def _add(totals, key, uj):
+    bucket = totals.get(key)
+    if bucket is None:
+        bucket = totals[key] = [0, 0]
+    bucket[1] += uj
+    bucket[0] += bucket[1] // 1000
+    bucket[1] %= 1000
+
+
+def _mwh(bucket):
+    # 1 mWh = 3600 mJ
+    mj = bucket[0]
+    return "%d.%03d" % (mj // 3600, mj % 3600 * 1000 // 3600)
+
+
+class EnergyProfiler:
+    """Attributes battery energy to actuators and modes."""
+
+    def __init__(self, hub, period_ms=PERIOD_MS, report_ms=REPORT_MS):
+        self.hub = hub
+        self.period_ms = period_ms
+        self.report_ms = report_ms
+        self.on = []
+        self.current_mode = "idle"
+        self.idle_ma = None
+        self.by_actuator = {}
+        self.by_mode = {}
+        self.total = [0, 0]
+        self._sample = StopWatch()
+        self._report = StopWatch()
+
+    def set(self, name, on):
+        """Mark an actuator as on or off."""
+        if on and name not in self.on:
+            self.on.append(name)
+        elif not on and name in self.on:
+            self.on.remove(name)
+
+    def mode(self, name):
+        self.current_mode = name
+
+    def update(self):
+        """Take a sample if the period has elapsed. Call this every tick."""
+        dt = self._sample.time()
+        if dt < self.period_ms:
+            return
+        self._sample.reset()
+
+        current = self.hub.battery.current()
+        voltage = self.hub.battery.voltage()
+        mw = current * voltage // 1000
+
+        if not self.on:
+            # Learn the idle draw with a slow running average.
+            if self.idle_ma is None:
+                self.idle_ma = current
+            else:
+                self.idle_ma += (current - self.idle_ma) // 8
+
+        idle_ma = min(current, self.idle_ma or 0)
+        idle_mw = idle_ma * voltage // 1000
+
+        _add(self.by_mode, self.current_mode, mw * dt)
+        _add(self.by_actuator, "idle", idle_mw * dt)
+        if self.on:
+            share = (mw - idle_mw) * dt // len(self.on)
+            for name in self.on:
+                _add(self.by_actuator, name, share)
+
+        self.total[1] += mw * dt
+        self.total[0] += self.total[1] // 1000
+        self.total[1] %= 1000
+
+        if self.report_ms and self._report.time() >= self.report_ms:
+            self._report.reset()
+            self.report()
+
+    def report(self):
+        print("Energy:", _mwh(self.total), "mWh total")
+        for name in self.by_actuator:
+            print("  ", name, _mwh(self.by_actuator[name]), "mWh")
+        for name in self.by_mode:
+            print("   mode", name, _mwh(self.by_mode[name]), "mWh")
@@ -1,40 +1,120 @@
 from pybricks.hubs import EssentialHub
 from pybricks.pupdevices import Motor, ColorSensor
-from pybricks.parameters import Port, Color
-from pybricks.tools import wait
+from pybricks.parameters import Port, Button, Color
+from pybricks.tools import wait, StopWatch
+
+from hubstore import HubStore
+from startup import Startup
+from watchdog import LoopWatchdog
+
+SPLASH_MS = 2000  # how long the battery color stays on at startup
+RECALIBRATE = False  # set to True once, with a PC attached, to measure the markers
+DEFAULT_COLORS = [Color.GREEN, Color.RED, Color.NONE]
+
+startup = Startup()
 
 hub = EssentialHub()
+store = HubStore(hub)
+store.load()
+
+
+def battery_color():
+    """Startup battery indicator color."""
+    return Color.GREEN if hub.battery.voltage() > 7000 else Color.YELLOW
+
+
+def setup_sensor():
+    sensor = ColorSensor(Port.B)
+    # Use the measured color table if there is one, otherwise the defaults.
+    if not RECALIBRATE:
+        sensor.detectable_colors(store.colors or DEFAULT_COLORS)
+    return sensor
+
+
+def calibrate_colors(sensor):
+    """Measure the green marker, the red marker and the floor.
+
+    For each one the hub light blinks in its color: hold the sensor over it
+    and press the hub button. Returns the table for detectable_colors().
+    """
+    hub.system.set_stop_button(None)
+    colors = []
+    for name, shown in (("green marker", Color.GREEN), ("red marker", Color.RED),
+                        ("floor", Color.WHITE)):
+        hub.light.blink(shown, [300, 300])
+        print("Hold the sensor over the", name, "and press the hub button.")
+        while Button.CENTER in hub.buttons.pressed():
+            wait(10)
+        while Button.CENTER not in hub.buttons.pressed():
+            wait(10)
+        colors.append(sensor.hsv())
+    hub.system.set_stop_button(Button.CENTER)
+    # Nothing in front of the sensor.
+    colors.append(Color.NONE)
+    return colors
+
+
+# Battery check, sensor setup and motor probe run side by side.
+startup.run(
+    startup.call("battery", battery_color),
+    startup.call("sensor", setup_sensor),
+    startup.device("motor", Motor, Port.A),
+)
+
+motor = startup.devices["motor"]
+sensor = startup.devices["sensor"]
+
+# Only on request: measure the markers under this room's light. Without a
+# measured table the program runs unattended on the defaults, as before.
+if RECALIBRATE:
+    store.colors = calibrate_colors(sensor)
+    store.dirty = True
+    store.save()
+    sensor.detectable_colors(store.colors)
+colors = store.colors or DEFAULT_COLORS
+GREEN, RED = colors[0], colors[1]
+
+# The battery color is shown while already driving, not in a blocking wait.
+hub.light.on(startup.devices["battery"])
+splash = StopWatch()
+splash_on = True
+print("Time to first drive:", startup.clock.time(), "ms")
+
+# Stop the track motor if a tick runs far over time, so dc(-100) never
+# keeps going while the loop is stuck.
+watchdog = LoopWatchdog()
+watchdog.register(motor)
+
+
+async def main():
+    global motor, splash_on
+    while True:
+        # Try to detect motor if not yet connected
+        if motor is None:
+            try:
+                motor = Motor(Port.A)
+                watchdog.register(motor)
+            except OSError:
+                pass
+
+        color = await sensor.color()
+
+        if color == GREEN:
+            if motor:
+                motor.dc(-100)
+            hub.light.on(Color.GREEN)
+            splash_on = False
+        elif color == RED:
+            if motor:
+                motor.stop()
+            hub.light.on(Color.RED)
+            splash_on = False
+        elif splash_on and splash.time() >= SPLASH_MS:
+            hub.light.on(Color.WHITE)
+            splash_on = False
+
+        watchdog.beat()
+        await wait(50)
+
 
-# Startup battery indicator
-voltage = hub.battery.voltage()
-if voltage > 7000:
-    hub.light.on(Color.GREEN)
-else:
-    hub.light.on(Color.YELLOW)
-wait(2000)
-hub.light.on(Color.WHITE)
-
-motor = None
-sensor = ColorSensor(Port.B)
-sensor.detectable_colors([Color.GREEN, Color.RED, Color.NONE])
-
-while True:
-    # Try to detect motor if not yet connected
-    if motor is None:
-        try:
-            motor = Motor(Port.A)
-        except OSError:
-            pass
-
-    color = sensor.color()
-
-    if color == Color.GREEN:
-        if motor:
-            motor.dc(-100)
-        hub.light.on(Color.GREEN)
-    elif color == Color.RED:
-        if motor:
-            motor.stop()
-        hub.light.on(Color.RED)
-
-    wait(50)
+watchdog.run(main())
@@ -0,0 +1,201 @@
+# Persistent calibration and pairing cache kept in hub.system.storage.
+#
+# Keeps the things every program used to redo on each boot:
+#   - steering center offset (absolute motor angle at straight-ahead)
+#   - color calibration table for ColorSensor / ColorDistanceSensor
+#   - name of the last paired remote, so we can connect to it directly
+#   - the vehicle profile picked at boot (see vehicle.py)
+#   - learned drive accelerations per surface (see adaptive_drive.py)
+#
+# Layout (little endian, CONFIG_SIZE bytes at offset 0):
+#   0      magic 0xB5
+#   1      layout version
+#   2..3   steering center, int16 (0x8000 = not calibrated)
+#   4      remote name length (0 = unknown)
+#   5..24  remote name, utf-8, zero padded
+#   25     number of colors
+#   26..49 up to MAX_COLORS colors: hue uint16, saturation, value
+#   50     selected vehicle profile + 1 (0 = none)
+#   51..62 MAX_SURFACES x (straight accel uint16, turn accel uint16), 0 = unknown
+#   63     checksum (sum of bytes 0..62, & 0xFF)
+#
+# A block with a wrong magic, version or checksum is ignored and the program
+# falls back to calibrating as before. Data written to storage is only saved
+# to flash when the hub is turned off with the button, not when the battery
+# is pulled.
+
+from pybricks.parameters import Color
+
+MAGIC = 0xB5
+VERSION = 1
+CONFIG_SIZE = 64
+
+MAX_NAME = 20
+MAX_COLORS = 6
+MAX_SURFACES = 3
+
+_NO_CENTER = 0x8000
+
+_OFS_CENTER = 2
+_OFS_NAME_LEN = 4
+_OFS_NAME = 5
+_OFS_COLOR_COUNT = 25
+_OFS_COLORS = 26
+_OFS_PROFILE = 50
+_OFS_ACCEL = 51
+_OFS_CHECKSUM = CONFIG_SIZE - 1
+
+
+def _get_u16(data, ofs):
+    return data[ofs] | (data[ofs + 1] << 8)
+
+
+def _put_u16(data, ofs, value):
+    data[ofs] = value & 0xFF
+    data[ofs + 1] = (value >> 8) & 0xFF
+
+
+def _checksum(data):
+    total = 0
+    for i in range(_OFS_CHECKSUM):
+        total += data[i]
+    return total & 0xFF
+
+
+class HubStore:
+    """Small persistent config block on top of hub.system.storage."""
+
+    def __init__(self, hub):
+        self.hub = hub
+        self.steer_center = None
+        self.remote_name = None
+        self.colors = []
+        self.profile = None
+        self.accel_limits = [None] * MAX_SURFACES
+        self.dirty = False
+
+    def load(self):
+        """Read the block from storage. Returns True if it was valid."""
+        try:
+            data = bytearray(self.hub.system.storage(0, read=CONFIG_SIZE))
+        except Exception as e:
+            print("Storage read error:", e)
+            return False
+
+        if data[0] != MAGIC or data[1] != VERSION or data[_OFS_CHECKSUM] != _checksum(data):
+            return False
+
+        center = _get_u16(data, _OFS_CENTER)
+        if center != _NO_CENTER:
+            self.steer_center = center - 0x10000 if center & 0x8000 else center
+
+        name_len = min(data[_OFS_NAME_LEN], MAX_NAME)
+        if name_len:
+            self.remote_name = bytes(data[_OFS_NAME:_OFS_NAME + name_len]).decode()
+
+        self.colors = []
+        for i in range(min(data[_OFS_COLOR_COUNT], MAX_COLORS)):
+            ofs = _OFS_COLORS + 4 * i
+            self.colors.append(Color(_get_u16(data, ofs), data[ofs + 2], data[ofs + 3]))
+
+        self.profile = data[_OFS_PROFILE] - 1 if data[_OFS_PROFILE] else None
+
+        for i in range(MAX_SURFACES):
+            ofs = _OFS_ACCEL + 4 * i
+            straight = _get_u16(data, ofs)
+            turn = _get_u16(data, ofs + 2)
+            self.accel_limits[i] = (straight, turn) if straight and turn else None
+
+        self.dirty = False
+        return True
+
+    def save(self):
+        """Write the block to storage if anything changed since load()."""
+        if not self.dirty:
+            return
+
+        data = bytearray(CONFIG_SIZE)
+        data[0] = MAGIC
+        data[1] = VERSION
+
+        center = _NO_CENTER if self.steer_center is None else self.steer_center & 0xFFFF
+        _put_u16(data, _OFS_CENTER, center)
+
+        if self.remote_name:
+            name = self.remote_name.encode()[:MAX_NAME]
+            data[_OFS_NAME_LEN] = len(name)
+            data[_OFS_NAME:_OFS_NAME + len(name)] = name
+
+        colors = self.colors[:MAX_COLORS]
+        data[_OFS_COLOR_COUNT] = len(colors)
+        for i, color in enumerate(colors):
+            ofs = _OFS_COLORS + 4 * i
+            _put_u16(data, ofs, color.h)
+            data[ofs + 2] = color.s
+            data[ofs + 3] = color.v
+
+        if self.profile is not None:
+            data[_OFS_PROFILE] = self.profile + 1
+
+        for i, limits in enumerate(self.accel_limits[:MAX_SURFACES]):
+            if limits:
+                _put_u16(data, _OFS_ACCEL + 4 * i, limits[0])
+                _put_u16(data, _OFS_ACCEL + 4 * i + 2, limits[1])
+
+        data[_OFS_CHECKSUM] = _checksum(data)
+
+        try:
+            self.hub.system.storage(0, write=bytes(data))
+            self.dirty = False
+        except Exception as e:
+            print("Storage write error:", e)
+
+
+def center_steering(motor, store):
+    """Zero the steering motor at its center.
+
+    On first boot the wheels are assumed to be straight (as before) and the
+    absolute angle is remembered. Later boots restore the center from the
+    store, so the wheels may be in any position at power-on.
+    Returns True if the cached center was used.
+    """
+    try:
+        motor.reset_angle()  # load the absolute encoder position
+    except Exception:
+        # Motor without absolute encoder: fall back to "centered at boot".
+        motor.reset_angle(0)
+        return False
+
+    if store.steer_center is None:
+        store.steer_center = motor.angle()
+        store.dirty = True
+        motor.reset_angle(0)
+        return False
+
+    # The absolute encoder wraps at +/-180, so take the short way round.
+    offset = (motor.angle() - store.steer_center + 180) % 360 - 180
+    motor.reset_angle(offset)
+    return True
+
+
+def connect_remote(store, timeout=None):
+    """Connect to the cached remote by name, falling back to any remote.
+
+    Connecting by name skips the other remotes advertising nearby. If the
+    cached remote does not show up within a short window, scan for any
+    remote with the given timeout and remember its name.
+    """
+    from pybricks.pupdevices import Remote
+
+    if store.remote_name:
+        try:
+            return Remote(store.remote_name, timeout=3000)
+        except OSError:
+            print("Remote", store.remote_name, "not found, scanning...")
+
+    remote = Remote(timeout=timeout)
+    name = remote.name()
+    if name != store.remote_name:
+        store.remote_name = name
+        store.dirty = True
+    return remote
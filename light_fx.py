@@ -0,0 +1,146 @@
+# Smooth effects for pybricks.pupdevices.Light.
+#
+# The eye is far more sensitive to changes in dim light than in bright
+# light, so a linear brightness ramp looks like it jumps at the bottom and
+# stalls at the top. LightFx works in perceived levels (0..100) and maps them
+# through a gamma table to the brightness written to the light. Fades,
+# flicker and the head/tail light pattern are advanced at their own rate by
+# update() or idle(), not from the button handler, and a light is only
+# written when its brightness after the table actually changes.
+
+from pybricks.tools import wait, StopWatch
+
+PERIOD_MS = 40          # 25 updates per second
+FADE_MS = 400           # default time for a full 0 -> 100 fade
+TAIL_LEVEL = 25         # perceived level of a light used as taillight
+
+# round(100 * (level / 100) ** 2.2), at least 1 for any lit level.
+GAMMA = (
+    0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 2, 2, 2, 2, 3,
+    3, 3, 4, 4, 4, 5, 5, 6, 6, 7, 7, 8, 8, 9, 9, 10, 11, 11, 12, 13,
+    13, 14, 15, 16, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 31,
+    33, 34, 35, 36, 37, 39, 40, 41, 43, 44, 46, 47, 49, 50, 52, 53, 55, 56, 58, 60,
+    61, 63, 65, 66, 68, 70, 72, 74, 75, 77, 79, 81, 83, 85, 87, 89, 91, 94, 96, 98,
+    100,
+)
+
+STEADY = 0
+FLICKER = 1
+
+
+class _Channel:
+    def __init__(self, light):
+        self.light = light
+        self.level = 0          # perceived level x 100, for smooth fades
+        self.target = 0
+        self.rate = 0           # level x 100 per ms
+        self.effect = STEADY
+        self.depth = 0
+        self.written = None
+
+    def write(self, brightness):
+        """Write brightness if it changed. Returns True if written."""
+        if brightness == self.written:
+            return False
+        self.written = brightness
+        if brightness == 0:
+            self.light.off()
+        else:
+            self.light.on(brightness)
+        return True
+
+
+class LightFx:
+    """Fades, flicker and head/tail patterns for a set of lights."""
+
+    def __init__(self, period_ms=PERIOD_MS):
+        self.period_ms = period_ms
+        self.channels = []
+        self.writes = 0
+        self._timer = StopWatch()
+        self._seed = 1
+
+    def add(self, light):
+        """Register a light. Returns a handle, or None if light is None."""
+        if light is None:
+            return None
+        channel = _Channel(light)
+        channel.write(0)
+        self.channels.append(channel)
+        return channel
+
+    def fade(self, channel, level, ms=FADE_MS):
+        """Fade to a perceived level 0..100; ms is the time for a full range."""
+        if channel is None:
+            return
+        channel.effect = STEADY
+        channel.target = level * 100
+        channel.rate = 10000 // ms if ms > 0 else 10000
+
+    def flicker(self, channel, level, depth=20, ms=FADE_MS):
+        """Fade to level, then flicker up to depth levels below it."""
+        if channel is None:
+            return
+        self.fade(channel, level, ms)
+        channel.effect = FLICKER
+        channel.depth = depth
+
+    def drive(self, front, rear, speed, level, ms=FADE_MS):
+        """Headlight in the direction of travel, taillight behind.
+
+        Stopped, both lights show level. Either light may be None.
+        """
+        tail = min(level, TAIL_LEVEL)
+        if speed > 0:
+            self.fade(front, level, ms)
+            self.fade(rear, tail, ms)
+        elif speed < 0:
+            self.fade(front, tail, ms)
+            self.fade(rear, level, ms)
+        else:
+            self.fade(front, level, ms)
+            self.fade(rear, level, ms)
+
+    def off(self, ms=0):
+        """Fade out all lights, instantly by default."""
+        for channel in self.channels:
+            self.fade(channel, 0, ms)
+            if ms == 0:
+                channel.level = 0
+                if channel.write(0):
+                    self.writes += 1
+
+    def _random(self, n):
+        # Small LCG, keeps every value a small int.
+        self._seed = (self._seed * 75 + 74) % 65537
+        return self._seed % (n + 1)
+
+    def _step(self, dt):
+        for channel in self.channels:
+            if channel.level < channel.target:
+                channel.level = min(channel.level + channel.rate * dt, channel.target)
+            elif channel.level > channel.target:
+                channel.level = max(channel.level - channel.rate * dt, channel.target)
+            level = channel.level // 100
+            if channel.effect == FLICKER and channel.level == channel.target and level:
+                level = max(1, level - self._random(channel.depth))
+            if channel.write(GAMMA[level]):
+                self.writes += 1
+
+    def update(self):
+        """Advance the effects if the period has elapsed. Call this every tick."""
+        dt = self._timer.time()
+        if dt < self.period_ms:
+            return
+        self._timer.reset()
+        self._step(dt)
+
+    def idle(self, ms):
+        """Wait ms while keeping the effects running, instead of wait(ms)."""
+        timer = StopWatch()
+        while True:
+            self.update()
+            left = ms - timer.time()
+            if left <= 0:
+                return
+            wait(max(1, min(left, self.period_ms - self._timer.time())))
@@ -0,0 +1,75 @@
+# Several motors commanded as one.
+#
+# Writing wheels one call at a time, with other work in between, leaves a
+# gap between the first and the last wheel changing speed, and the vehicle
+# yaws briefly on every direction change. MotorGroup takes all setpoints at
+# once, writes them back to back in a tight loop and skips motors whose
+# command did not change, so a change usually touches as few motors as
+# possible.
+#
+# A batch is a few back-to-back calls, far below the 1 ms resolution of
+# StopWatch, so its duration is not measured (it would always read 0).
+# Instead batch / max_batch count the motors written in the last and the
+# largest batch: the gap between the first and the last wheel is that many
+# calls, with nothing else in between.
+
+_STOP = 0
+_DC = 1
+_RUN = 2
+
+
+class MotorGroup:
+    """Applies a tuple of setpoints to a tuple of motors in one batch."""
+
+    def __init__(self, motors):
+        self.motors = tuple(motors)
+        self._modes = [None] * len(self.motors)
+        self._values = [None] * len(self.motors)
+        self.batch = 0
+        self.max_batch = 0
+        self.writes = 0
+        self.skipped = 0
+
+    def _apply(self, mode, setpoints):
+        motors = self.motors
+        modes = self._modes
+        values = self._values
+        written = 0
+
+        for i in range(len(motors)):
+            value = setpoints[i] if setpoints else 0
+            if modes[i] == mode and values[i] == value:
+                continue
+            if mode == _DC:
+                motors[i].dc(value)
+            elif mode == _RUN:
+                motors[i].run(value)
+            else:
+                motors[i].stop()
+            modes[i] = mode
+            values[i] = value
+            written += 1
+
+        self.writes += written
+        self.skipped += len(motors) - written
+        if written:
+            self.batch = written
+            if written > self.max_batch:
+                self.max_batch = written
+
+    def dc(self, duties):
+        """Set the duty cycle of each motor, -100..100."""
+        self._apply(_DC, duties)
+
+    def run(self, speeds):
+        """Run each motor at the given speed in deg/s."""
+        self._apply(_RUN, speeds)
+
+    def stop(self):
+        """Stop all motors (coast)."""
+        self._apply(_STOP, None)
+
+    def invalidate(self):
+        """Forget the cached commands, e.g. after the motors were stopped elsewhere."""
+        for i in range(len(self.motors)):
+            self._modes[i] = None
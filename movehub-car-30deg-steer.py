@@ -1,23 +1,34 @@
 from pybricks.hubs import MoveHub
-from pybricks.pupdevices import Motor, Remote
+from pybricks.pupdevices import Motor
 from pybricks.parameters import Port, Button, Color, Stop
-from pybricks.tools import wait
+from pybricks.tools import wait, StopWatch
+
+from hubstore import HubStore, center_steering
+from motor_group import MotorGroup
+from remote_session import RemoteSession
+
+boot = StopWatch()
 
 hub = MoveHub()
+store = HubStore(hub)
+store.load()
 
 motor_a = Motor(Port.A)
 motor_b = Motor(Port.B)
+drive = MotorGroup([motor_a, motor_b])  # A and B always change together
 
 try:
     steering = Motor(Port.D)
-    steering.reset_angle(0)
+    center_steering(steering, store)
 except Exception:
     steering = None
 
 hub.light.on(Color.ORANGE)
-remote = Remote(timeout=None)
+remote = RemoteSession(store, [motor_a, motor_b] + ([steering] if steering else []),
+                       failsafe=drive.invalidate)
+remote.connect()
 hub.light.on(Color.GREEN)
-wait(500)
+print("Time to first drive:", boot.time(), "ms")
 
 DRIVE_SPEED = 10000  # max speed, deg/s (clamped to hardware limit)
 STEER_SPEED = 500    # deg/s for steering movement
@@ -26,11 +37,10 @@ STEER_ANGLE = 45     # fixed 45° left/right
 was_steering = False
 
 while True:
-    pressed = remote.buttons.pressed()
+    pressed = remote.pressed()
 
     if Button.CENTER in pressed:
-        motor_a.stop()
-        motor_b.stop()
+        drive.stop()
         if steering:
             steering.stop()
         hub.light.on(Color.RED)
@@ -39,14 +49,11 @@ while True:
 
     # RIGHT +/- : drive forward / backward
     if Button.RIGHT_PLUS in pressed:
-        motor_a.run(DRIVE_SPEED)
-        motor_b.run(-DRIVE_SPEED)
+        drive.run((DRIVE_SPEED, -DRIVE_SPEED))
     elif Button.RIGHT_MINUS in pressed:
-        motor_a.run(-DRIVE_SPEED)
-        motor_b.run(DRIVE_SPEED)
+        drive.run((-DRIVE_SPEED, DRIVE_SPEED))
     else:
-        motor_a.stop()
-        motor_b.stop()
+        drive.stop()
 
     # LEFT +/- : fixed 30° steering, auto-center on release
     is_steering = Button.LEFT_PLUS in pressed or Button.LEFT_MINUS in pressed
@@ -59,8 +66,10 @@ while True:
             steering.run_target(STEER_SPEED, 0, then=Stop.HOLD, wait=False)
     was_steering = is_steering
 
-    # Hub light feedback
-    if Button.RIGHT_PLUS in pressed:
+    # Hub light feedback, orange while reconnecting
+    if not remote.connected:
+        hub.light.on(Color.ORANGE)
+    elif Button.RIGHT_PLUS in pressed:
         hub.light.on(Color.GREEN)
     elif Button.RIGHT_MINUS in pressed:
         hub.light.on(Color.ORANGE)
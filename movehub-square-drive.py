@@ -1,30 +1,74 @@
 # pybricks-micropython
 
-from pybricks.hubs import MoveHub
 from pybricks.parameters import Direction, Port, Color
 from pybricks.pupdevices import ColorDistanceSensor, Motor
 from pybricks.robotics import DriveBase
+from pybricks.tools import StopWatch
+
+from adaptive_drive import AdaptiveDrive
+from gyro_drive import GyroHeading, has_gyro
+from hubstore import HubStore
+from path_executor import PathExecutor, arc, line
 
 # --- Setup ---
-hub = MoveHub()
+# Also runs on a Technic Hub (same ports), which adds gyro-assisted turns.
+# Each firmware only has its own hub class, so both imports are guarded.
+try:
+    from pybricks.hubs import TechnicHub as Hub
+except ImportError:
+    from pybricks.hubs import MoveHub as Hub
+hub = Hub()
+store = HubStore(hub)
+store.load()
 sensor = ColorDistanceSensor(Port.C)
 left = Motor(Port.A, Direction.COUNTERCLOCKWISE)
 right = Motor(Port.B, Direction.CLOCKWISE)
 robot = DriveBase(left, right, 43, 112)
 
-# Faster motion (tune to your surface to avoid slip).
-robot.settings(
+# Which set of learned accelerations to use (0..2), one per floor.
+SURFACE = 0
+
+# With a gyro, turns end on the measured heading, so they can be much faster.
+# The acceleration goes up with the rate: a 180° turn only reaches
+# sqrt(180 * turn_acceleration) deg/s, 254 deg/s at 360 deg/s^2.
+gyro = None
+turn_rate = 180             # deg/s
+turn_acceleration = 360     # deg/s^2
+if has_gyro(hub):
+    gyro = GyroHeading(hub, robot)
+    gyro.calibrate()        # keep the robot still for a moment at startup
+    turn_rate = 540
+    turn_acceleration = 1800
+
+# Accelerations are only starting values: they are backed off when the
+# wheels slip and raised only while the hub senses the robot keeping up
+# (accelerometer on straights, gyro on turns), and remembered per surface.
+drive = AdaptiveDrive(
+    robot, left, right, store, SURFACE,
     straight_speed=300,         # mm/s
     straight_acceleration=700,  # mm/s^2
-    turn_rate=180,              # deg/s
-    turn_acceleration=360       # deg/s^2
+    turn_rate=turn_rate,
+    turn_acceleration=turn_acceleration,
+    gyro=gyro,
+    hub=hub,
+    forward_axis=0,             # hub X axis points in the driving direction
+    wheel_diameter=43,          # as in the DriveBase above, mm
+    axle_track=112
 )
 
 # --- Behavior controls ---
 SIDE_MM  = 250   # side length for the square
-STEP_MM  = 15    # step size so we can check often for white
 CLEAR_MM = 40    # move forward after the 180° spin to clear the white area
 
+# Blended corners: drive the lap as one continuous path, carrying speed
+# through each corner on an arc instead of stopping to turn on the spot.
+# The arcs get the same slip checks as the rest: after a slip in a corner
+# the robot stops once and drives the rest of the lap slower. Set False for
+# the stop-and-turn lap.
+BLENDED = True
+CORNER_RADIUS = 60   # mm
+CORNER_DEG = 180     # same corner as the stop-and-turn version
+
 # Direction of 90° corner turns: +1 = left (CCW), -1 = right (CW)
 turn_dir = +1
 
@@ -38,8 +82,8 @@ def handle_white_and_reverse():
     """On white: stop, rotate 180°, move off the patch, flip turn direction."""
     global turn_dir
     hard_stop_hold()
-    robot.turn(180)
-    robot.straight(CLEAR_MM)
+    drive.turn(180)
+    drive.straight(CLEAR_MM)
     turn_dir *= -1
 
 def see_white_by_color():
@@ -49,29 +93,52 @@ def see_white_by_color():
 
 def drive_side_with_white_handling():
     """
-    Drive ~SIDE_MM in STEP_MM chunks, checking for white before and after each step.
+    Drive SIDE_MM in one move, checking for white all the way and at the end.
     Returns True if a white event was handled; False otherwise.
     """
-    traveled = 0
-    while traveled < SIDE_MM:
-        if see_white_by_color():
-            handle_white_and_reverse()
-            return True
+    completed = drive.straight(SIDE_MM, check=see_white_by_color)
+    if not completed or see_white_by_color():
+        handle_white_and_reverse()
+        return True
 
-        step = min(STEP_MM, SIDE_MM - traveled)
-        robot.straight(step)
-        traveled += step
+    return False
 
-        if see_white_by_color():
-            handle_white_and_reverse()
-            return True
+def drive_square_blended():
+    """Drive the four sides and corners as one path, resuming after white."""
+    segments = []
+    for _ in range(4):
+        segments += [line(SIDE_MM), arc(CORNER_RADIUS, CORNER_DEG)]
 
-    return False
+    start = 0
+    while start < len(segments):
+        stopped = path.run(segments[start:], check=see_white_by_color, mirror=turn_dir)
+        if stopped is None:
+            break
+        handle_white_and_reverse()
+        start += stopped + 1
 
 # --- Main: drive a square; reverse behavior on white ---
-for _ in range(4):
-    _white_triggered = drive_side_with_white_handling()
-    robot.turn(180 * turn_dir)
+path = PathExecutor(drive)
+lap = StopWatch()
+
+if BLENDED:
+    drive_square_blended()
+else:
+    for _ in range(4):
+        _white_triggered = drive_side_with_white_handling()
+        drive.turn(CORNER_DEG * turn_dir)
 
 # Ensure motors are stopped and held at the end.
 hard_stop_hold()
+print("Lap time:", lap.time(), "ms", "blended" if BLENDED else "stop-and-turn")
+if BLENDED and gyro:
+    # Only measured with a gyro; odometry cannot see how far a corner slid.
+    print("Max corner error:", path.max_corner_error, "deg")
+
+# Keep what was learned about this surface for the next run.
+drive.save()
+print("Slips:", drive.slips, "accelerations:", drive.accel, "speed:", drive.speeds[0])
+if gyro:
+    # Learned accelerations may keep turns below the set rate.
+    print("Turn rate:", turn_rate, "set,", drive.peak_turn_rate, "reached,",
+          "max heading error:", drive.max_heading_error)
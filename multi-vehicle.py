@@ -0,0 +1,25 @@
+# One program for all remote-controlled vehicles in profiles.py.
+#
+# Upload this together with vehicle.py, profiles.py, hubstore.py,
+# remote_session.py, trace_log.py, motor_group.py and throttle.py. At boot
+# the hub light shows the color of the last used profile for this hub type;
+# press the hub button within 3 seconds to step to the next one. The choice is remembered for the next
+# boot. Button presses, remote drops, battery changes and errors are kept in
+# the trace log; run trace-dump.py to read them back.
+
+from pybricks.tools import StopWatch
+
+from hubstore import HubStore
+from profiles import PROFILES
+from trace_log import TraceLog
+from vehicle import Vehicle, detect_hub, select_profile
+
+boot = StopWatch()
+
+hub, hub_name = detect_hub()
+store = HubStore(hub)
+store.load()
+
+profile = select_profile(hub, hub_name, PROFILES, store)
+trace = TraceLog(hub)
+Vehicle(hub, store, profile, trace).run(boot)
@@ -1,10 +1,16 @@
 from pybricks.hubs import MoveHub
 from pybricks.parameters import Button, Color, Direction, Port
-from pybricks.pupdevices import Motor, Remote
+from pybricks.pupdevices import Motor
 from pybricks.tools import wait
 
+from hubstore import HubStore
+from motor_group import MotorGroup
+from remote_session import RemoteSession
+
 # --- Hub setup ---
 hub = MoveHub()
+store = HubStore(hub)
+store.load()
 
 # --- 4 motors: left side (A, C) and right side (B, D) ---
 # Flip Direction if a wheel spins the wrong way for your build.
@@ -13,13 +19,20 @@ left_rear   = Motor(Port.C, Direction.COUNTERCLOCKWISE)
 right_front = Motor(Port.B, Direction.CLOCKWISE)
 right_rear  = Motor(Port.D, Direction.CLOCKWISE)
 
+# All four wheels are written as one batch so they change speed together.
+wheels = MotorGroup([left_front, left_rear, right_front, right_rear])
+
 # --- Connect Powered UP Remote (train remote) ---
 # Press the green button on the remote BEFORE running this script.
+# If it drops later, all wheels stop and it is reconnected by name.
 hub.light.blink(Color.YELLOW, [500, 500])
-remote = Remote(timeout=None)
+remote = RemoteSession(store, [left_front, left_rear, right_front, right_rear],
+                       failsafe=wheels.invalidate)
+remote.connect()
 hub.light.on(Color.GREEN)
 
 SPEED = 100   # max power for all movements
+reported_batch = 0
 
 # --- Main loop ---
 # Button map:
@@ -30,61 +43,47 @@ SPEED = 100   # max power for all movements
 #   LEFT_PLUS   → only A (left_front) and C (left_rear) run forward
 #   LEFT_MINUS  → only B (right_front) and D (right_rear) run forward
 while True:
-    pressed = remote.buttons.pressed()
+    pressed = remote.pressed()
 
     if Button.RIGHT in pressed:
         # Tank turn right: left side forward, right side backward.
-        left_front.dc(SPEED)
-        left_rear.dc(SPEED)
-        right_front.dc(-SPEED)
-        right_rear.dc(-SPEED)
-        remote.light.on(Color.ORANGE)
+        wheels.dc((SPEED, SPEED, -SPEED, -SPEED))
+        remote.light(Color.ORANGE)
 
     elif Button.LEFT in pressed:
         # Tank turn left: right side forward, left side backward.
-        left_front.dc(-SPEED)
-        left_rear.dc(-SPEED)
-        right_front.dc(SPEED)
-        right_rear.dc(SPEED)
-        remote.light.on(Color.ORANGE)
+        wheels.dc((-SPEED, -SPEED, SPEED, SPEED))
+        remote.light(Color.ORANGE)
 
     elif Button.RIGHT_PLUS in pressed:
         # All 4 wheels forward, max speed.
-        left_front.dc(SPEED)
-        left_rear.dc(SPEED)
-        right_front.dc(SPEED)
-        right_rear.dc(SPEED)
-        remote.light.on(Color.GREEN)
+        wheels.dc((SPEED, SPEED, SPEED, SPEED))
+        remote.light(Color.GREEN)
 
     elif Button.RIGHT_MINUS in pressed:
         # All 4 wheels backward, max speed.
-        left_front.dc(-SPEED)
-        left_rear.dc(-SPEED)
-        right_front.dc(-SPEED)
-        right_rear.dc(-SPEED)
-        remote.light.on(Color.RED)
+        wheels.dc((-SPEED, -SPEED, -SPEED, -SPEED))
+        remote.light(Color.RED)
 
     elif Button.LEFT_PLUS in pressed:
         # Only A (left_front) and C (left_rear).
-        left_front.dc(SPEED)
-        left_rear.dc(SPEED)
-        right_front.dc(0)
-        right_rear.dc(0)
-        remote.light.on(Color.CYAN)
+        wheels.dc((SPEED, SPEED, 0, 0))
+        remote.light(Color.CYAN)
 
     elif Button.LEFT_MINUS in pressed:
         # Only B (right_front) and D (right_rear).
-        left_front.dc(0)
-        left_rear.dc(0)
-        right_front.dc(SPEED)
-        right_rear.dc(SPEED)
-        remote.light.on(Color.CYAN)
+        wheels.dc((0, 0, SPEED, SPEED))
+        remote.light(Color.CYAN)
 
     else:
-        left_front.dc(0)
-        left_rear.dc(0)
-        right_front.dc(0)
-        right_rear.dc(0)
-        remote.light.on(Color.WHITE)
+        wheels.dc((0, 0, 0, 0))
+        remote.light(Color.WHITE)
+
+    # Report the most wheels changed in one batch, and how many writes the
+    # group saved by skipping unchanged wheels.
+    if wheels.max_batch > reported_batch:
+        reported_batch = wheels.max_batch
+        print("Max wheels per batch:", reported_batch, "- writes:", wheels.writes,
+              "skipped:", wheels.skipped)
 
     wait(20)
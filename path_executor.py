@@ -0,0 +1,69 @@
+# Continuous path execution for DriveBase.
+#
+# A path is a list of segments: line(distance) and arc(radius, angle). They
+# are run back to back with then=Stop.NONE, so the robot carries its speed
+# from a straight into a curve instead of braking to a stop at every corner.
+# Only the last segment ends in a hold. A check() callback is polled the
+# whole way, e.g. to abort on a white patch.
+#
+# Arcs run through AdaptiveDrive.arc(), so they get the same slip checks
+# and gyro heading cutoff as turns on the spot. The corner error is only
+# kept with a GyroHeading, as the heading at the end of each arc. Wheel
+# odometry is what the controller drives to its target, so it reads near
+# zero however far the robot slid; without a gyro max_corner_error stays
+# None.
+
+from pybricks.parameters import Stop
+from pybricks.tools import wait
+
+LINE = 0
+ARC = 1
+
+POLL_MS = 10
+
+
+def line(distance):
+    return (LINE, distance, 0)
+
+
+def arc(radius, angle):
+    return (ARC, radius, angle)
+
+
+class PathExecutor:
+    """Runs a list of segments without stopping between them."""
+
+    def __init__(self, drive):
+        self.drive = drive
+        self.robot = drive.robot
+        self.gyro = drive.gyro
+        self.max_corner_error = 0 if self.gyro else None
+
+    def run(self, segments, check=None, mirror=1):
+        """Drive the segments; arc angles are multiplied by mirror (+1/-1).
+
+        Returns None when the path is done, or the index of the segment
+        during which check() returned True (the robot is then stopped).
+        """
+        robot = self.robot
+        last = len(segments) - 1
+        for i, (kind, a, b) in enumerate(segments):
+            then = Stop.HOLD if i == last else Stop.NONE
+            if kind == ARC:
+                if self.gyro:
+                    heading = self.gyro.heading() + b * mirror
+                if not self.drive.arc(a, b * mirror, then=then, check=check):
+                    return i
+                if self.gyro:
+                    error = abs(self.gyro.heading() - heading)
+                    if error > self.max_corner_error:
+                        self.max_corner_error = error
+                continue
+
+            robot.straight(a, then=then, wait=False)
+            while not robot.done():
+                if check and check():
+                    robot.stop()
+                    return i
+                wait(POLL_MS)
+        return None
@@ -0,0 +1,222 @@
+# Vehicle profiles for multi-vehicle.py.
+#
+# Each profile is plain data; vehicle.Vehicle compiles it at startup.
+#   name        shown in the log when selected
+#   hub         hub class the profile runs on
+#   color       hub light color used while choosing profiles at boot
+#   motors      (name, port, direction, optional)
+#   center      steering motors to zero at their cached center
+#   car         (steering motor, [drive motors]) for a pybricks Car
+#   channels    (motor names, mode, [(button, setpoints)], speed for TARGET/CENTER)
+#               the first pressed button in the table wins
+#   stop        remote button for an emergency stop of all motors
+#   quit        remote button that ends the program
+#   hub_light   [(button, color)], None as the last button is the default
+#   remote_light  same, for the remote light
+#   accessories (kind, *args), see vehicle.ACCESSORIES
+#   tick        loop period in ms
+
+from pybricks.parameters import Button, Color, Direction, Port
+
+from vehicle import RUN, DC, TARGET, CENTER, CAR_DRIVE, CAR_STEER
+
+CW = Direction.CLOCKWISE
+CCW = Direction.COUNTERCLOCKWISE
+
+# --- Technic 42160 (Technic Hub, Car with steering on D) ---
+
+_42160_MOTORS = (
+    ("steering", Port.D, CW, False),
+    ("front", Port.B, CW, False),
+    ("rear", Port.A, CW, False),
+)
+
+_42160_STEER_LEFT = ((("car",), CAR_STEER, (
+    (Button.LEFT_PLUS, (100,)),
+    (Button.LEFT_MINUS, (-100,)),
+), 0),)
+
+_42160_DRIVE_RIGHT = ((("car",), CAR_DRIVE, (
+    (Button.RIGHT_PLUS, (100,)),
+    (Button.RIGHT_MINUS, (-100,)),
+), 0),)
+
+TECHNIC_42160 = {
+    "name": "42160",
+    "hub": "TechnicHub",
+    "color": Color.WHITE,
+    "motors": _42160_MOTORS,
+    "car": ("steering", ("front", "rear")),
+    "channels": _42160_STEER_LEFT + _42160_DRIVE_RIGHT,
+}
+
+TECHNIC_42160_LIGHT = dict(TECHNIC_42160)
+TECHNIC_42160_LIGHT.update({
+    "name": "42160 + light",
+    "color": Color.YELLOW,
+    "accessories": (("light", Port.C),),
+})
+
+TECHNIC_42160_MATRIX = dict(TECHNIC_42160)
+TECHNIC_42160_MATRIX.update({
+    "name": "42160 + matrix",
+    "color": Color.MAGENTA,
+    "accessories": (("matrix", Port.C, 6800, 60000),),
+})
+
+TECHNIC_42160_HUB_LIGHT = dict(TECHNIC_42160)
+TECHNIC_42160_HUB_LIGHT.update({
+    "name": "42160 + battery light",
+    "color": Color.GREEN,
+    # This build has drive on the left stick and steering on the right.
+    "channels": (
+        (("car",), CAR_DRIVE, (
+            (Button.LEFT_PLUS, (100,)),
+            (Button.LEFT_MINUS, (-100,)),
+        ), 0),
+        (("car",), CAR_STEER, (
+            (Button.RIGHT_PLUS, (100,)),
+            (Button.RIGHT_MINUS, (-100,)),
+        ), 0),
+    ),
+    "quit": Button.CENTER,
+    "accessories": (("battery_light", 7200, 5000, 60000),),
+})
+
+# --- Move Hub vehicles ---
+
+_DRIVE_SPEED = 1000
+
+CAR_88006 = {
+    "name": "88006 car",
+    "hub": "MoveHub",
+    "color": Color.GREEN,
+    "motors": (
+        ("a", Port.A, CW, False),
+        ("b", Port.B, CW, False),
+        ("steering", Port.D, CW, True),
+    ),
+    "center": ("steering",),
+    "channels": (
+        (("a", "b"), RUN, (
+            (Button.LEFT_PLUS, (_DRIVE_SPEED, -_DRIVE_SPEED)),
+            (Button.LEFT_MINUS, (-_DRIVE_SPEED, _DRIVE_SPEED)),
+        ), 0),
+        (("steering",), CENTER, (
+            (Button.RIGHT_PLUS, (200,)),
+            (Button.RIGHT_MINUS, (-200,)),
+        ), 200),
+    ),
+    "stop": Button.CENTER,
+    "hub_light": (
+        (Button.LEFT_PLUS, Color.GREEN),
+        (Button.LEFT_MINUS, Color.ORANGE),
+        (None, Color.WHITE),
+    ),
+}
+
+_FAST_DRIVE_SPEED = 10000  # as movehub-car-30deg-steer.py: max, clamped by the motor
+
+CAR_30DEG = {
+    "name": "car with fixed steering",
+    "hub": "MoveHub",
+    "color": Color.BLUE,
+    "motors": (
+        ("a", Port.A, CW, False),
+        ("b", Port.B, CW, False),
+        ("steering", Port.D, CW, True),
+    ),
+    "center": ("steering",),
+    "channels": (
+        (("a", "b"), RUN, (
+            (Button.RIGHT_PLUS, (_FAST_DRIVE_SPEED, -_FAST_DRIVE_SPEED)),
+            (Button.RIGHT_MINUS, (-_FAST_DRIVE_SPEED, _FAST_DRIVE_SPEED)),
+        ), 0),
+        (("steering",), TARGET, (
+            (Button.LEFT_PLUS, (45,)),
+            (Button.LEFT_MINUS, (-45,)),
+        ), 500),
+    ),
+    "stop": Button.CENTER,
+    "hub_light": (
+        (Button.RIGHT_PLUS, Color.GREEN),
+        (Button.RIGHT_MINUS, Color.ORANGE),
+        (None, Color.WHITE),
+    ),
+}
+
+SAND_TRUCK = {
+    "name": "sand truck",
+    "hub": "MoveHub",
+    "color": Color.ORANGE,
+    "motors": (
+        ("a", Port.A, CW, False),
+        ("b", Port.B, CW, False),
+        ("d", Port.D, CW, False),
+    ),
+    "channels": (
+        (("a", "b"), RUN, (
+            (Button.LEFT_PLUS, (_DRIVE_SPEED, -_DRIVE_SPEED)),
+            (Button.LEFT_MINUS, (-_DRIVE_SPEED, _DRIVE_SPEED)),
+            (Button.RIGHT_PLUS, (_DRIVE_SPEED, _DRIVE_SPEED)),
+            (Button.RIGHT_MINUS, (-_DRIVE_SPEED, -_DRIVE_SPEED)),
+        ), 0),
+        (("d",), RUN, (
+            (Button.LEFT, (100,)),
+            (Button.RIGHT, (-100,)),
+        ), 0),
+    ),
+    "stop": Button.CENTER,
+    "hub_light": (
+        (Button.LEFT_PLUS, Color.GREEN),
+        (Button.RIGHT_PLUS, Color.GREEN),
+        (Button.LEFT_MINUS, Color.ORANGE),
+        (Button.RIGHT_MINUS, Color.ORANGE),
+        (None, Color.WHITE),
+    ),
+}
+
+_OMNI = 100
+
+OMNIDIRECTIONAL = {
+    "name": "omnidirectional",
+    "hub": "MoveHub",
+    "color": Color.CYAN,
+    "motors": (
+        ("lf", Port.A, CCW, False),
+        ("lr", Port.C, CCW, False),
+        ("rf", Port.B, CW, False),
+        ("rr", Port.D, CW, False),
+    ),
+    "channels": (
+        (("lf", "lr", "rf", "rr"), DC, (
+            (Button.RIGHT, (_OMNI, _OMNI, -_OMNI, -_OMNI)),
+            (Button.LEFT, (-_OMNI, -_OMNI, _OMNI, _OMNI)),
+            (Button.RIGHT_PLUS, (_OMNI, _OMNI, _OMNI, _OMNI)),
+            (Button.RIGHT_MINUS, (-_OMNI, -_OMNI, -_OMNI, -_OMNI)),
+            (Button.LEFT_PLUS, (_OMNI, _OMNI, 0, 0)),
+            (Button.LEFT_MINUS, (0, 0, _OMNI, _OMNI)),
+        ), 0),
+    ),
+    "remote_light": (
+        (Button.RIGHT, Color.ORANGE),
+        (Button.LEFT, Color.ORANGE),
+        (Button.RIGHT_PLUS, Color.GREEN),
+        (Button.RIGHT_MINUS, Color.RED),
+        (Button.LEFT_PLUS, Color.CYAN),
+        (Button.LEFT_MINUS, Color.CYAN),
+        (None, Color.WHITE),
+    ),
+    "tick": 20,
+}
+
+PROFILES = [
+    TECHNIC_42160,
+    TECHNIC_42160_LIGHT,
+    TECHNIC_42160_MATRIX,
+    TECHNIC_42160_HUB_LIGHT,
+    CAR_88006,
+    CAR_30DEG,
+    SAND_TRUCK,
+    OMNIDIRECTIONAL,
+]
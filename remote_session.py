@@ -0,0 +1,97 @@
+# Remote connection that survives the remote dropping out mid-session.
+#
+# remote.buttons.pressed() raises OSError once the remote disconnects, which
+# used to end the program with the motors still running. RemoteSession
+# catches that, stops the registered motors right away (within one loop
+# tick) and keeps trying to reconnect to the same remote by name.
+#
+# The scan is not in the background: Remote() blocks, so while the remote
+# is gone each retry freezes the calling loop for scan_ms, once every
+# retry_ms (300 of every 1000 ms by default). The motors are already
+# stopped then, but anything else the loop does (lights, stall checks,
+# accessories) runs in bursts. Lower scan_ms or raise retry_ms if that
+# matters more than how fast the remote comes back.
+
+from pybricks.pupdevices import Remote
+from pybricks.tools import StopWatch
+
+from hubstore import connect_remote
+
+
+class RemoteSession:
+    """Wraps a Remote with disconnect detection and reconnect.
+
+    Reconnect attempts block the caller for up to scan_ms each, see above.
+    """
+
+    def __init__(self, store, motors=(), failsafe=None, retry_ms=1000, scan_ms=300,
+                 remote=None):
+        self.store = store
+        self.motors = motors
+        self.failsafe = failsafe
+        self.retry_ms = retry_ms
+        self.scan_ms = scan_ms
+        self.remote = remote  # already connected elsewhere, e.g. by Startup
+        self.disconnects = 0
+        self._retry = StopWatch()
+
+    @property
+    def connected(self):
+        return self.remote is not None
+
+    def connect(self, timeout=None):
+        """Initial (blocking) connect, preferring the cached remote."""
+        self.remote = connect_remote(self.store, timeout)
+        self.store.save()
+        return self.remote
+
+    def stop_all(self):
+        """Put all registered motors in a safe state."""
+        for motor in self.motors:
+            try:
+                motor.stop()
+            except Exception:
+                pass
+        if self.failsafe:
+            self.failsafe()
+
+    def _lost(self):
+        self.remote = None
+        self.disconnects += 1
+        self.stop_all()
+        self._retry.reset()
+        print("Remote lost, motors stopped")
+
+    def _try_reconnect(self):
+        if self._retry.time() < self.retry_ms:
+            return
+        self._retry.reset()
+        try:
+            # Only scan briefly and only for our own remote, so the loop
+            # gets to run between attempts. This call blocks for up to
+            # scan_ms.
+            self.remote = Remote(self.store.remote_name, timeout=self.scan_ms)
+            print("Remote reconnected")
+        except OSError:
+            pass
+
+    def pressed(self):
+        """Return the pressed buttons, or an empty set while disconnected."""
+        if self.remote is None:
+            self._try_reconnect()
+            if self.remote is None:
+                return set()
+        try:
+            return self.remote.buttons.pressed()
+        except OSError:
+            self._lost()
+            return set()
+
+    def light(self, color):
+        """Set the remote light, ignoring a dropped connection."""
+        if self.remote is None:
+            return
+        try:
+            self.remote.light.on(color)
+        except OSError:
+            self._lost()
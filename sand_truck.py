@@ -1,70 +1,95 @@
 from pybricks.hubs import MoveHub
-from pybricks.pupdevices import Motor, Remote
+from pybricks.pupdevices import Motor
 from pybricks.parameters import Port, Button, Color
-from pybricks.tools import wait
+from pybricks.tools import wait, StopWatch
 
-# Initialize the hub
+from energy_profiler import EnergyProfiler
+from hubstore import HubStore
+from motor_group import MotorGroup
+from remote_session import RemoteSession
+from stall_monitor import StallMonitor
+
+boot = StopWatch()
+
+# Initialize the hub and load the cached remote name
 hub = MoveHub()
+store = HubStore(hub)
+store.load()
 
 # Motors
 motor_a = Motor(Port.A)
 motor_b = Motor(Port.B)
 motor_d = Motor(Port.D)
+drive = MotorGroup([motor_a, motor_b])  # A and B always change together
+
+# Port D is cut when its mechanism hits an end stop with the button held.
+stalls = StallMonitor(hub)
+stalls.register(motor_d, "port D")
 
-# Wait for the remote to connect
+# Battery energy per actuator, printed every minute.
+energy = EnergyProfiler(hub)
+
+# Wait for the remote to connect (cached remote is tried first).
+# All motors are stopped if it drops out; it reconnects in the loop.
 hub.light.on(Color.ORANGE)
-remote = Remote(timeout=None)
+remote = RemoteSession(store, [motor_a, motor_b, motor_d], failsafe=drive.invalidate)
+remote.connect()
 hub.light.on(Color.GREEN)
-wait(500)
+print("Time to first drive:", boot.time(), "ms")
 
 SPEED = 1000        # degrees per second
 SLOW_SPEED = 100    # slowest speed for port D
 
 while True:
-    pressed = remote.buttons.pressed()
+    pressed = remote.pressed()
 
     # CENTER button → stop all
     if Button.CENTER in pressed:
-        motor_a.stop()
-        motor_b.stop()
-        motor_d.stop()
+        drive.stop()
+        stalls.stop(motor_d)
         hub.light.on(Color.RED)
-        remote.light.on(Color.RED)
+        remote.light(Color.RED)
         wait(50)
         continue
 
     # LEFT PLUS: A forward, B backward
     # LEFT MINUS: A backward, B forward
     if Button.LEFT_PLUS in pressed:
-        motor_a.run(SPEED)
-        motor_b.run(-SPEED)
+        drive.run((SPEED, -SPEED))
     elif Button.LEFT_MINUS in pressed:
-        motor_a.run(-SPEED)
-        motor_b.run(SPEED)
+        drive.run((-SPEED, SPEED))
     # RIGHT PLUS: both forward
     # RIGHT MINUS: both backward
     elif Button.RIGHT_PLUS in pressed:
-        motor_a.run(SPEED)
-        motor_b.run(SPEED)
+        drive.run((SPEED, SPEED))
     elif Button.RIGHT_MINUS in pressed:
-        motor_a.run(-SPEED)
-        motor_b.run(-SPEED)
+        drive.run((-SPEED, -SPEED))
     else:
-        motor_a.stop()
-        motor_b.stop()
+        drive.stop()
 
     # Red buttons → Port D motor
     # LEFT red: clockwise (slowest)
     # RIGHT red: anticlockwise (slowest)
     if Button.LEFT in pressed:
-        motor_d.run(SLOW_SPEED)
+        stalls.run(motor_d, SLOW_SPEED)
     elif Button.RIGHT in pressed:
-        motor_d.run(-SLOW_SPEED)
+        stalls.run(motor_d, -SLOW_SPEED)
     else:
-        motor_d.stop()
+        stalls.stop(motor_d)
+    stalls.update()
+
+    driving = bool(pressed & {Button.LEFT_PLUS, Button.LEFT_MINUS, Button.RIGHT_PLUS, Button.RIGHT_MINUS})
+    # Port D only draws power while it is not cut after a stall.
+    dumping = (Button.LEFT in pressed or Button.RIGHT in pressed) and not stalls.blocked(motor_d)
+    energy.set("drive A+B", driving)
+    energy.set("port D", dumping)
+    energy.mode("dump" if dumping else "drive" if driving else "idle")
+    energy.update()
 
-    # Hub light mirrors state
-    if Button.LEFT_PLUS in pressed or Button.RIGHT_PLUS in pressed:
+    # Hub light mirrors state, orange while reconnecting
+    if not remote.connected:
+        hub.light.on(Color.ORANGE)
+    elif Button.LEFT_PLUS in pressed or Button.RIGHT_PLUS in pressed:
         hub.light.on(Color.GREEN)
     elif Button.LEFT_MINUS in pressed or Button.RIGHT_MINUS in pressed:
         hub.light.on(Color.ORANGE)
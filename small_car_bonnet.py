@@ -1,27 +1,37 @@
 #!/usr/bin/env pybricks-micropython
 from pybricks.hubs import EssentialHub
-from pybricks.pupdevices import Motor, Remote
+from pybricks.pupdevices import Motor
 from pybricks.parameters import Port, Direction, Button, Color
 
-from pybricks.tools import wait
+from pybricks.tools import wait, StopWatch
 
-# Initialize the hub
+from hubstore import HubStore
+from remote_session import RemoteSession
+
+boot = StopWatch()
+
+# Initialize the hub and load the cached remote name
 hub = EssentialHub()
+store = HubStore(hub)
+store.load()
 
 # Individual motors — no DriveBase, each side driven independently
 left_motor = Motor(Port.A, Direction.COUNTERCLOCKWISE)
 right_motor = Motor(Port.B)
 
-# Wait for the remote to connect
+# Wait for the remote to connect (cached remote is tried first).
+# Both motors are stopped if it drops out; it reconnects in the loop.
 hub.light.on(Color.ORANGE)
-remote = Remote(timeout=None)
+remote = RemoteSession(store, [left_motor, right_motor])
+remote.connect()
 hub.light.on(Color.GREEN)
-wait(500)
+print("Time to first drive:", boot.time(), "ms")
 
 SPEED = 1000  # degrees per second (max)
 
 while True:
-    pressed = remote.buttons.pressed()
+    pressed = remote.pressed()
+    hub.light.on(Color.GREEN if remote.connected else Color.ORANGE)
 
     # --- Left side buttons → left motor ---
     if Button.LEFT_PLUS in pressed:
@@ -0,0 +1,291 @@
+# Headless model of movehub-square-drive.py, for tuning on a computer.
+#
+# This runs on a PC with regular Python, not on the hub. It is a kinematic
+# model, not a physics engine: straights and turns follow the DriveBase
+# trapezoid speed profile, and the floor is reduced to a grip limit. Above
+# that limit the wheels slip and the robot loses distance and heading. The
+# white patch is seen one poll interval late and the robot brakes to a stop
+# on it. Energy is idle draw plus a term per distance and per acceleration.
+#
+# Straights and turns go through AdaptiveDrive in the script, so they do
+# here too: the accelerations in Config are the starting values of a fresh
+# surface, backed off after a slipping move and raised after clean moves
+# the hub can sense (see adaptive_drive.py). Learned limits already in the
+# hub store are not modelled; they replace the starting values on the hub.
+# Good enough to rank settings against each other. Check the winners on the
+# real floor.
+#
+# Both corner styles of the script are modelled: stop-and-turn, and blended
+# corners where the lap is one path with arcs (see path_executor.py). An arc
+# that slips makes the robot stop at its end and drive on slower, as
+# AdaptiveDrive.arc() does.
+#
+#   python square_sim.py    compares the two on a set of floors
+
+import math
+
+WHEEL_DIAMETER = 43     # mm, as in movehub-square-drive.py
+AXLE_TRACK = 112        # mm
+
+POLL_MS = 10            # AdaptiveDrive sample period
+SENSOR_MS = 15          # ColorDistanceSensor color() latency
+SLIP_MM = 8             # distance lost per move at twice the grip limit
+SLIP_DEG = 6            # heading lost per turn at twice the grip limit
+OVERSHOOT_S = 0.012     # heading settling error per deg/s of turn rate
+GYRO_TOLERANCE = 1      # deg, turns end on the measured heading
+UNCLEARED_MM = 100      # path error if the robot ends up on the patch
+
+# AdaptiveDrive, as in adaptive_drive.py.
+BACKOFF = 0.7
+RAMP_UP = 1.1
+CLEAN_RUNS = 2
+MAX_ACCEL = (3000, 2000)  # straight mm/s^2, turn deg/s^2
+
+IDLE_W = 0.35
+J_PER_M = 2.0
+J_PER_M2_S2 = 1.5       # per (m/s)^2 of peak speed, spent speeding up and braking
+
+
+class Config:
+    """The script constants being tuned."""
+
+    FIELDS = ("straight_speed", "straight_acceleration", "turn_rate",
+              "turn_acceleration", "clear_mm", "gyro", "blended", "corner_radius")
+
+    def __init__(self, straight_speed=300, straight_acceleration=700,
+                 turn_rate=180, turn_acceleration=360, clear_mm=40, gyro=False,
+                 blended=False, corner_radius=60):
+        self.straight_speed = straight_speed
+        self.straight_acceleration = straight_acceleration
+        self.turn_rate = turn_rate
+        self.turn_acceleration = turn_acceleration
+        self.clear_mm = clear_mm
+        self.gyro = gyro
+        self.blended = blended
+        self.corner_radius = corner_radius
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+class Scenario:
+    """One floor and, optionally, one white patch across a side."""
+
+    def __init__(self, grip=900, side_mm=250, white_side=None, white_at_mm=0,
+                 white_depth_mm=60):
+        self.grip = grip                  # mm/s^2 the wheels transmit without slip
+        self.side_mm = side_mm
+        self.white_side = white_side      # index of the side with the patch
+        self.white_at_mm = white_at_mm
+        self.white_depth_mm = white_depth_mm
+
+
+class Result:
+    def __init__(self):
+        self.time_s = 0.0
+        self.path_error_mm = 0.0
+        self.energy_j = 0.0
+        self.heading_error_deg = 0.0
+        self.corner_error_deg = 0.0
+
+    def score(self, w_time=1.0, w_error=0.05, w_energy=0.2):
+        return w_time * self.time_s + w_error * self.path_error_mm + w_energy * self.energy_j
+
+
+def profile(distance, speed, accel):
+    """Return (duration s, peak speed) of a trapezoid move."""
+    distance = abs(distance)
+    if distance == 0:
+        return 0.0, 0.0
+    if distance * accel >= speed * speed:
+        return distance / speed + speed / accel, speed
+    peak = math.sqrt(distance * accel)
+    return 2 * peak / accel, peak
+
+
+def _slip(accel, grip):
+    return max(0.0, accel / grip - 1.0)
+
+
+class _Robot:
+    def __init__(self, config, scenario, result):
+        self.c = config
+        self.s = scenario
+        self.r = result
+        self.turn_dir = 1
+        self.accel = [config.straight_acceleration, config.turn_acceleration]
+        self.minima = [a / 4 for a in self.accel]
+        self.clean = [0, 0]
+        self.speed = config.straight_speed  # lowered by arcs that slip
+        self.turn_rate = config.turn_rate
+
+    def _adapt(self, kind, slipped, sensed):
+        """AdaptiveDrive._learn(): back off on a slip, ramp up on sensed grip."""
+        if slipped:
+            self.clean[kind] = 0
+            self.accel[kind] = max(self.minima[kind], self.accel[kind] * BACKOFF)
+        elif not sensed:
+            self.clean[kind] = 0
+        else:
+            self.clean[kind] += 1
+            if self.clean[kind] >= CLEAN_RUNS:
+                self.clean[kind] = 0
+                self.accel[kind] = min(MAX_ACCEL[kind], self.accel[kind] * RAMP_UP)
+
+    def _energy(self, t, distance_mm, peak_mm_s):
+        self.r.time_s += t
+        self.r.energy_j += IDLE_W * t + J_PER_M * distance_mm / 1000
+        self.r.energy_j += J_PER_M2_S2 * (peak_mm_s / 1000) ** 2
+
+    def straight(self, distance):
+        c = self.c
+        accel = self.accel[0]
+        t, peak = profile(distance, self.speed, accel)
+        self._energy(t, abs(distance), peak)
+        slip = _slip(accel, self.s.grip)
+        self.r.path_error_mm += SLIP_MM * slip
+        self._adapt(0, slip > 0, True)  # both hubs have an accelerometer
+        # Heading error from earlier turns shows up as sideways drift.
+        self.r.path_error_mm += abs(distance) * math.sin(math.radians(self.r.heading_error_deg))
+
+    def turn(self, angle):
+        c = self.c
+        accel = self.accel[1]
+        t, peak = profile(angle, self.turn_rate, accel)
+        wheel_peak = peak * math.pi / 180 * AXLE_TRACK / 2
+        wheel_accel = accel * math.pi / 180 * AXLE_TRACK / 2
+        self._energy(t, abs(angle) * math.pi / 180 * AXLE_TRACK / 2 * 2, wheel_peak)
+        slip = _slip(wheel_accel, self.s.grip)
+        self._adapt(1, slip > 0, c.gyro)  # turns are only judged with a gyro
+        error = SLIP_DEG * slip + OVERSHOOT_S * self.turn_rate
+        if c.gyro:
+            error = min(error, GYRO_TOLERANCE)
+        self.r.heading_error_deg += error
+        self.r.corner_error_deg = max(self.r.corner_error_deg, error)
+
+    # --- Blended path: speed is carried between segments ---
+
+    def arc_speed(self):
+        c = self.c
+        return min(self.speed, self.turn_rate * math.pi / 180 * c.corner_radius)
+
+    def speed_change(self, v_from, v_to):
+        """Time and energy to change speed without stopping."""
+        a = self.accel[0]
+        dv = abs(v_from - v_to)
+        self.r.time_s += dv * dv / (2 * a * max(v_from, v_to, 1))
+        self.r.energy_j += J_PER_M2_S2 * abs(v_from * v_from - v_to * v_to) / 1e6
+
+    def cruise(self, distance):
+        t = abs(distance) / self.speed
+        self._energy(t, abs(distance), 0)
+        self.r.path_error_mm += abs(distance) * math.sin(math.radians(self.r.heading_error_deg))
+
+    def arc(self, angle):
+        c = self.c
+        v = self.arc_speed()
+        length = c.corner_radius * abs(math.radians(angle))
+        self.speed_change(self.speed, v)
+        self._energy(length / v, length, 0)
+        # Sideways grip in the curve, and the heading lagging when the
+        # rotation stops at the end of the arc, like the settling error of a
+        # turn at the same rate. With a gyro the arc ends on the measured
+        # heading, which leaves only the tolerance.
+        slip = _slip(v * v / c.corner_radius, self.s.grip)
+        error = SLIP_DEG * slip + OVERSHOOT_S * math.degrees(v / c.corner_radius)
+        if c.gyro:
+            error = min(error, GYRO_TOLERANCE)
+        self.r.heading_error_deg += error
+        self.r.corner_error_deg = max(self.r.corner_error_deg, error)
+        if slip > 0:
+            # Stop at the end of the arc, back off the speed, start again.
+            self.r.time_s += v / (2 * self.accel[0])
+            v = max(c.straight_speed / 4, v * BACKOFF)
+            if v < self.speed:
+                self.turn_rate = math.degrees(v / c.corner_radius)
+            else:
+                self.speed = v
+            self.start()
+        else:
+            self.speed_change(v, self.speed)
+
+    def start(self):
+        """Speed up from standstill into the path."""
+        c = self.c
+        self.r.time_s += self.speed / (2 * self.accel[0])
+        self.r.energy_j += J_PER_M2_S2 * (self.speed / 1000) ** 2
+        self.r.path_error_mm += SLIP_MM * _slip(self.accel[0], self.s.grip)
+
+    def finish(self):
+        c = self.c
+        self.r.time_s += self.speed / (2 * self.accel[0])
+
+    def side(self, index):
+        """Drive one side. Returns True if the white patch was handled."""
+        c = self.c
+        s = self.s
+        if s.white_side != index:
+            self.straight(s.side_mm)
+            return False
+
+        # Drive up to the patch, notice it late, brake to a stop on it.
+        at = s.white_at_mm
+        accel = self.accel[0]
+        t, peak = profile(at, self.speed, accel)
+        speed = min(peak, self.speed)
+        late_mm = speed * (POLL_MS + SENSOR_MS) / 1000
+        brake_mm = speed * speed / (2 * accel)
+        self.straight(at + late_mm + brake_mm)
+
+        # handle_white_and_reverse(): hold, spin around, back off the patch.
+        # The robot stopped inside this far from the near edge; past the far
+        # edge if the patch is shallow, and then CLEAR_MM drives back onto it.
+        self.turn(180)
+        self.straight(c.clear_mm)
+        end_mm = late_mm + brake_mm - c.clear_mm
+        if 0 < end_mm < s.white_depth_mm:
+            self.r.path_error_mm += UNCLEARED_MM
+        self.turn_dir = -self.turn_dir
+        return True
+
+
+def run(config, scenario):
+    """Simulate one run of the square routine. Returns a Result."""
+    result = Result()
+    robot = _Robot(config, scenario, result)
+    if not config.blended:
+        for i in range(4):
+            robot.side(i)
+            robot.turn(180 * robot.turn_dir)
+        return result
+
+    robot.start()
+    for i in range(4):
+        if scenario.white_side == i:
+            # Stops on the patch like the stop-and-turn version, then
+            # speeds up again into the corner.
+            robot.finish()
+            robot.side(i)
+            robot.start()
+        else:
+            robot.cruise(scenario.side_mm)
+        robot.arc(180 * robot.turn_dir)
+    robot.finish()
+    return result
+
+
+def compare(config=None, grips=(500, 800, 1200, 2000)):
+    """Print lap time and corner error, stop-and-turn against blended."""
+    config = config or Config()
+    print("%6s %-14s %7s %10s %10s" % ("grip", "corners", "lap s", "corner deg", "path mm"))
+    for grip in grips:
+        for blended in (False, True):
+            config.blended = blended
+            r = run(config, Scenario(grip=grip))
+            print("%6d %-14s %7.2f %10.2f %10.1f" % (
+                grip, "blended" if blended else "stop-and-turn",
+                r.time_s, r.corner_error_deg, r.path_error_mm))
+
+
+if __name__ == "__main__":
+    compare()
@@ -0,0 +1,141 @@
+# Stall monitor for motors that are driven for as long as a button is held.
+#
+# A mechanism that reaches its end stop while the button is still held sits
+# stalled, drawing current and heating up. The monitor watches each
+# registered motor's speed, load(), stalled() and control.stalled(). Once a
+# stall is confirmed it cuts the motor (or drops it to a low holding duty)
+# and refuses further drive in that direction until the command changes.
+#
+# For every stall it records the time from the first sign of it (speed
+# collapsing under load) to the cutoff. While a motor stays cut it sums the
+# battery power that the cut saved, measured as the drop in battery current
+# right after the cut. When the cut is lifted the totals so far are printed.
+
+from pybricks.tools import StopWatch
+
+CUT = 0
+REDUCE = 1
+
+REDUCED_DUTY = 30   # % duty kept on REDUCE, enough to hold against the stop
+ONSET_PCT = 20      # speed below this share of the command = stall starting
+MAX_EVENTS = 8
+
+
+class _Watched:
+    def __init__(self, motor, name, action):
+        self.motor = motor
+        self.name = name
+        self.action = action
+        self.speed = 0
+        self.blocked = 0
+        self.onset = None
+        self.before_ma = 0
+        self.saved_ma = None
+
+
+class StallMonitor:
+    """Cuts or reduces drive to stalled motors and keeps stall statistics."""
+
+    def __init__(self, hub):
+        self.hub = hub
+        self.watched = []
+        self.events = []
+        self.stalls = 0
+        self.max_latency_ms = 0
+        self.saved_mj = 0
+        self._uj = 0
+        self._clock = StopWatch()
+        self._last = 0
+
+    def register(self, motor, name, action=CUT):
+        self.watched.append(_Watched(motor, name, action))
+
+    def _find(self, motor):
+        for w in self.watched:
+            if w.motor is motor:
+                return w
+        raise ValueError("Motor not registered")
+
+    def run(self, motor, speed):
+        """motor.run(speed), unless this direction was cut after a stall."""
+        w = self._find(motor)
+        direction = (speed > 0) - (speed < 0)
+        if w.blocked and w.blocked != direction:
+            self._release(w)
+        w.speed = speed
+        if not w.blocked:
+            motor.run(speed)
+
+    def clear(self, motor):
+        """Forget the command and any stall cut, before commanding it directly."""
+        w = self._find(motor)
+        w.speed = 0
+        w.onset = None
+        if w.blocked:
+            self._release(w)
+
+    def blocked(self, motor):
+        """True while the motor's drive is cut (or reduced) after a stall."""
+        return self._find(motor).blocked != 0
+
+    def stop(self, motor):
+        """motor.stop(), and clear any stall cut on it."""
+        self.clear(motor)
+        motor.stop()
+
+    def _release(self, w):
+        # The stall is over: the command changed after the cut.
+        w.blocked = 0
+        self.report()
+
+    def update(self):
+        """Check all registered motors. Call this every loop tick."""
+        now = self._clock.time()
+        dt = now - self._last
+        self._last = now
+
+        for w in self.watched:
+            motor = w.motor
+
+            if w.blocked:
+                # Count what the cut saves while the button is still held.
+                current = self.hub.battery.current()
+                if w.saved_ma is None:
+                    w.saved_ma = max(0, w.before_ma - current)
+                self._uj += w.saved_ma * self.hub.battery.voltage() // 1000 * dt
+                self.saved_mj += self._uj // 1000
+                self._uj %= 1000
+                continue
+
+            if not w.speed:
+                continue
+
+            if w.onset is None and abs(motor.speed()) * 100 < abs(w.speed) * ONSET_PCT and motor.load():
+                w.onset = now
+            elif w.onset is not None and abs(motor.speed()) * 100 >= abs(w.speed) * ONSET_PCT:
+                w.onset = None
+
+            if not (motor.stalled() or motor.control.stalled()):
+                continue
+
+            w.before_ma = self.hub.battery.current()
+            w.blocked = 1 if w.speed > 0 else -1
+            if w.action == REDUCE:
+                motor.dc(REDUCED_DUTY * w.blocked)
+            else:
+                motor.stop()
+            w.saved_ma = None
+
+            latency = self._clock.time() - (now if w.onset is None else w.onset)
+            w.onset = None
+            self.stalls += 1
+            self.max_latency_ms = max(self.max_latency_ms, latency)
+            self.events.append((w.name, now, latency))
+            if len(self.events) > MAX_EVENTS:
+                self.events.pop(0)
+            print("Stall on", w.name, "- drive cut after", latency, "ms")
+
+    def report(self):
+        print("Stalls:", self.stalls,
+              "| max stall-to-cutoff:", self.max_latency_ms, "ms",
+              "| saved:", self.saved_mj, "mJ")
@@ -0,0 +1,78 @@
+# Concurrent startup stages.
+#
+# Programs used to probe each port, then block in Remote(), then wait a
+# fixed time before driving. Startup runs the stages as pybricks tasks
+# instead: device probes, the remote scan and any quick checks interleave,
+# and the time at which each stage finished is logged. The remote is
+# scanned for in short windows, so the other stages (and the hub light
+# animation, which the firmware runs by itself) keep going while it is
+# being found. Probes and quick checks do their work on their first step and
+# the remote scan yields once before its first window, so all probes are done
+# before the first scan blocks, whatever order the stages are listed in.
+
+from pybricks.tools import wait, StopWatch, multitask, run_task
+
+CACHED_REMOTE_MS = 3000  # how long to look only for the cached remote
+SCAN_WINDOW_MS = 300
+
+
+class Startup:
+    """Runs startup stages concurrently and logs when each is ready."""
+
+    def __init__(self):
+        self.clock = StopWatch()
+        self.devices = {}
+        self.ready_at = {}
+        self.failed = None
+
+    def mark(self, name):
+        t = self.clock.time()
+        self.ready_at[name] = t
+        print("Startup:", name, "ready at", t, "ms")
+
+    async def device(self, name, factory, *args, required=False):
+        """Create a device with factory(*args); None if it is not there."""
+        try:
+            device = factory(*args)
+        except Exception:
+            device = None
+        self.devices[name] = device
+        if device is None and required:
+            self.failed = name
+        self.mark(name)
+        await wait(0)
+
+    async def call(self, name, func, *args):
+        """Run a quick stage, keeping its result in devices[name]."""
+        self.devices[name] = func(*args)
+        self.mark(name)
+        await wait(0)
+
+    async def remote(self, store=None, timeout=None):
+        """Scan for the remote, cached one first, in short windows."""
+        from pybricks.pupdevices import Remote
+
+        name = store.remote_name if store else None
+        await wait(0)  # let the probes run before the first window blocks
+        timer = StopWatch()
+        while self.failed is None:
+            cached = name if timer.time() < CACHED_REMOTE_MS else None
+            try:
+                remote = Remote(cached, timeout=SCAN_WINDOW_MS)
+                break
+            except OSError:
+                if timeout is not None and timer.time() >= timeout:
+                    raise
+            await wait(0)
+        else:
+            return  # a required device is missing, no point connecting
+
+        if store and remote.name() != store.remote_name:
+            store.remote_name = remote.name()
+            store.dirty = True
+        self.devices["remote"] = remote
+        self.mark("remote")
+
+    def run(self, *stages):
+        """Run all stages until each one has finished."""
+        run_task(multitask(*stages))
@@ -19,10 +19,14 @@
 
 from pybricks.hubs import TechnicHub
 from pybricks.parameters import Button, Color, Direction, Port
-from pybricks.pupdevices import Motor, Remote
+from pybricks.pupdevices import Motor
 from pybricks.robotics import Car
 from pybricks.tools import wait
 
+from hubstore import HubStore
+from remote_session import RemoteSession
+from throttle import ThrottleShaper
+
 # --- Tuning constants ---
 BATTERY_LOW_MV = 7200        # Voltage threshold for "low" (millivolts). Fully charged ≈ 8400 mV
 CHECK_INTERVAL_MS = 5000     # How often to check battery (ms)
@@ -35,13 +39,17 @@ steering = Motor(Port.D, Direction.CLOCKWISE)
 front = Motor(Port.B, Direction.CLOCKWISE)
 rear = Motor(Port.A, Direction.CLOCKWISE)
 car = Car(steering, [front, rear])
-remote = Remote(timeout=None)
+throttle = ThrottleShaper(hub)  # ramps drive power within battery limits
+store = HubStore(hub)
+store.load()
+remote = RemoteSession(store, [steering, front, rear], failsafe=throttle.reset)
+remote.connect()  # stops the car and reconnects if the remote drops later
 
 low_battery_timer = 0
 last_check = 0
 
 while True:
-    pressed = remote.buttons.pressed()
+    pressed = remote.pressed()
 
     # CENTER (green) button → quit
     if Button.CENTER in pressed:
@@ -65,10 +73,10 @@ while True:
                 hub.light.off()  # 1 min yellow elapsed → light off, hub keeps running
 
     # Drive control — left: forward/backward, right: steering
-    car.drive_power(
+    car.drive_power(throttle.update(
         100 if Button.LEFT_PLUS in pressed
         else (-100 if Button.LEFT_MINUS in pressed else 0)
-    )
+    ))
     car.steer(
         100 if Button.RIGHT_PLUS in pressed
         else (-100 if Button.RIGHT_MINUS in pressed else 0)
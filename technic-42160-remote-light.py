@@ -1,24 +1,40 @@
+from pybricks.hubs import TechnicHub
 from pybricks.parameters import Button, Direction, Port
-from pybricks.pupdevices import Motor, Remote, Light
+from pybricks.pupdevices import Motor, Light
 from pybricks.robotics import Car
 from pybricks.tools import wait
 
+from energy_profiler import EnergyProfiler
+from hubstore import HubStore
+from remote_session import RemoteSession
+from throttle import ThrottleShaper
+
 # https://pybricks.com/project/technic-42160-powered-up-remote/#the-car-in-action
 
 # Set up all devices.
+hub = TechnicHub()
 steering = Motor(Port.D, Direction.CLOCKWISE)
 front = Motor(Port.B, Direction.CLOCKWISE)
 rear = Motor(Port.A, Direction.CLOCKWISE)
 car = Car(steering, [front, rear])
 
-# Remote and light on Port C
-remote = Remote(timeout=None)
+# Ramp drive power instead of jumping to 100%, within the battery's limits.
+throttle = ThrottleShaper(hub)
+
+# Battery energy per actuator, printed every minute.
+energy = EnergyProfiler(hub)
+
+# Light on Port C, remote by cached name first
 light = Light(Port.C)
+store = HubStore(hub)
+store.load()
+remote = RemoteSession(store, [steering, front, rear], failsafe=throttle.reset)
+remote.connect()  # stops the car and reconnects if the remote drops later
 
 # The main program starts here.
 while True:
     # Read buttons once per loop to avoid querying multiple times.
-    pressed = remote.buttons.pressed()
+    pressed = remote.pressed()
 
     # Turn light on if any button is pressed; otherwise turn it off.
     if pressed:
@@ -33,9 +49,16 @@ while True:
     )
 
     # Control drive power using the right - and + buttons.
-    car.drive_power(
+    car.drive_power(throttle.update(
         100 if Button.RIGHT_PLUS in pressed
         else (-100 if Button.RIGHT_MINUS in pressed else 0)
-    )
+    ))
+
+    # Energy accounting: what is on right now, and at which power.
+    energy.set("light", bool(pressed))
+    energy.set("drive", throttle.output != 0)
+    energy.set("steering", Button.LEFT_PLUS in pressed or Button.LEFT_MINUS in pressed)
+    energy.mode("full power" if abs(throttle.output) == 100 else "part power" if throttle.output else "coast")
+    energy.update()
 
     wait(50)
@@ -1,16 +1,24 @@
 from pybricks.hubs import TechnicHub
 from pybricks.parameters import Button, Color, Direction, Port
-from pybricks.pupdevices import ColorLightMatrix, Motor, Remote
+from pybricks.pupdevices import ColorLightMatrix, Motor
 from pybricks.robotics import Car
 from pybricks.tools import wait
 
+from hubstore import HubStore
+from remote_session import RemoteSession
+from throttle import ThrottleShaper
+
 hub = TechnicHub()
 steering = Motor(Port.D, Direction.CLOCKWISE)
 front = Motor(Port.B, Direction.CLOCKWISE)
 rear = Motor(Port.A, Direction.CLOCKWISE)
 car = Car(steering, [front, rear])
+throttle = ThrottleShaper(hub)  # ramps drive power within battery limits
 matrix = ColorLightMatrix(Port.C)
-remote = Remote(timeout=None)
+store = HubStore(hub)
+store.load()
+remote = RemoteSession(store, [steering, front, rear], failsafe=throttle.reset)
+remote.connect()  # stops the car and reconnects if the remote drops later
 
 blink = False
 green_on = False
@@ -24,10 +32,10 @@ WARNING_TICKS = 1200  # 60 seconds at 50ms per tick
 WARNING_VOLTAGE = 6800
 
 while True:
-    pressed = remote.buttons.pressed()
+    pressed = remote.pressed()
     new_presses = pressed - prev_pressed
     car.steer(100 if Button.LEFT_PLUS in pressed else -100 if Button.LEFT_MINUS in pressed else 0)
-    car.drive_power(100 if Button.RIGHT_PLUS in pressed else -100 if Button.RIGHT_MINUS in pressed else 0)
+    car.drive_power(throttle.update(100 if Button.RIGHT_PLUS in pressed else -100 if Button.RIGHT_MINUS in pressed else 0))
 
     # Button toggles (ignored during warning)
     if not warning_active:
@@ -1,23 +1,35 @@
+from pybricks.hubs import TechnicHub
 from pybricks.parameters import Button, Direction, Port
-from pybricks.pupdevices import Motor, Remote
+from pybricks.pupdevices import Motor
 from pybricks.robotics import Car
 from pybricks.tools import wait
 
+from hubstore import HubStore
+from remote_session import RemoteSession
+from throttle import ThrottleShaper
+
 # https://pybricks.com/project/technic-42160-powered-up-remote/#the-car-in-action
 
 # Set up all devices.
+hub = TechnicHub()
 steering = Motor(Port.D, Direction.CLOCKWISE)
 front = Motor(Port.B, Direction.CLOCKWISE)
 rear = Motor(Port.A, Direction.CLOCKWISE)
 car = Car(steering, [front, rear])
 
-# Remote
-remote = Remote(timeout=None)
+# Ramp drive power instead of jumping to 100%, within the battery's limits.
+throttle = ThrottleShaper(hub)
+
+# Remote, by cached name first
+store = HubStore(hub)
+store.load()
+remote = RemoteSession(store, [steering, front, rear], failsafe=throttle.reset)
+remote.connect()  # stops the car and reconnects if the remote drops later
 
 # The main program starts here.
 while True:
     # Read buttons once per loop to avoid querying multiple times.
-    pressed = remote.buttons.pressed()
+    pressed = remote.pressed()
 
     # Control steering using the left - and + buttons.
     car.steer(
@@ -26,9 +38,9 @@ while True:
     )
 
     # Control drive power using the right - and + buttons.
-    car.drive_power(
+    car.drive_power(throttle.update(
         100 if Button.RIGHT_PLUS in pressed
         else (-100 if Button.RIGHT_MINUS in pressed else 0)
-    )
+    ))
 
     wait(50)
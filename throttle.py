@@ -0,0 +1,83 @@
+# Current-limited throttle ramp.
+#
+# Jumping straight from 0 to full power draws a large inrush current. On a
+# tired battery that sags the voltage far enough to reset the hub. The
+# shaper ramps the power up at a fixed rate and watches the battery while
+# doing so: it stops raising the power while the voltage is near the
+# brownout limit, or the current is at its limit, and backs off if the
+# voltage keeps falling. Lowering the power is never delayed, so stopping
+# is still instant.
+
+from pybricks.tools import StopWatch
+
+RATE = 200          # % per second, 0 -> 100 in half a second
+MIN_MV = 6000       # never let the battery sag below this while ramping
+MAX_SAG_MV = 1200   # or drop more than this below the resting voltage
+MAX_CURRENT_MA = 2000
+BACKOFF = 5         # % removed per update while below MIN_MV
+MAX_DT_MS = 100     # longest gap between updates that still counts as ramp time
+
+
+class ThrottleShaper:
+    """Ramps a -100..100 power setpoint within the battery's limits."""
+
+    def __init__(self, hub, rate=RATE, min_mv=MIN_MV, max_sag_mv=MAX_SAG_MV,
+                 max_current_ma=MAX_CURRENT_MA):
+        self.hub = hub
+        self.rate = rate
+        self.min_mv = min_mv
+        self.max_sag_mv = max_sag_mv
+        self.max_current_ma = max_current_ma
+        self.output = 0
+        self.rest_mv = hub.battery.voltage()
+        self.capped = 0
+        self._timer = None  # started by the first update()
+        self._carry = 0
+
+    def reset(self):
+        """Forget the ramp, e.g. after the motors were stopped from outside."""
+        self.output = 0
+        self._carry = 0
+
+    def update(self, target):
+        """Return the power to apply this tick for the requested target."""
+        if self._timer is None:
+            # Time spent before the first update (e.g. waiting for the
+            # remote) is no ramp time.
+            self._timer = StopWatch()
+        # Nor is a long stall between two updates.
+        dt = min(self._timer.time(), MAX_DT_MS)
+        self._timer.reset()
+
+        output = self.output
+        if output and (target == 0 or (target > 0) != (output > 0)):
+            # Stopping or reversing: drop to zero at once.
+            output = 0
+
+        voltage = self.hub.battery.voltage()
+        if output == 0:
+            self.rest_mv = voltage
+
+        if abs(target) <= abs(output):
+            output = target
+            self._carry = 0
+        else:
+            limit_mv = max(self.min_mv, self.rest_mv - self.max_sag_mv)
+            if voltage < limit_mv or self.hub.battery.current() > self.max_current_ma:
+                # At the limit: hold, or back off if we are already below it.
+                self.capped += 1
+                self._carry = 0
+                if voltage < self.min_mv:
+                    step = min(BACKOFF, abs(output))
+                    output -= step if output > 0 else -step
+            else:
+                self._carry += self.rate * dt
+                step = self._carry // 1000
+                self._carry -= step * 1000
+                if target > 0:
+                    output = min(target, output + step)
+                else:
+                    output = max(target, output - step)
+
+        self.output = output
+        return output
@@ -0,0 +1,31 @@
+# Print the trace log kept by trace_log.py, to be decoded on a computer.
+#
+# Run this with the hub connected and save the output, for example:
+#
+#   pybricksdev run ble trace-dump.py > trace.txt
+#   python trace_decode.py trace.txt
+#
+# Upload together with trace_log.py, hubstore.py, vehicle.py and the
+# modules vehicle.py imports: remote_session.py, motor_group.py and
+# throttle.py. The log itself is left as it is.
+
+from trace_log import TRACE_OFFSET, TRACE_SIZE, SMALL_TRACE_SIZE
+from vehicle import detect_hub
+
+LINE_BYTES = 32
+
+hub, hub_name = detect_hub()
+
+for size in (TRACE_SIZE, SMALL_TRACE_SIZE):
+    try:
+        data = bytes(hub.system.storage(TRACE_OFFSET, read=size))
+        break
+    except Exception:
+        data = None
+
+if data is None:
+    print("No trace storage on", hub_name)
+else:
+    print("TRACE", hub_name, len(data))
+    for i in range(0, len(data), LINE_BYTES):
+        print("TRACE", "".join("%02x" % b for b in data[i:i + LINE_BYTES]))
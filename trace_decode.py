@@ -0,0 +1,112 @@
+# Decode the trace log printed by trace-dump.py.
+#
+# Runs on a PC, not on the hub:
+#
+#   python trace_decode.py trace.txt
+#   pybricksdev run ble trace-dump.py | python trace_decode.py
+#
+# Prints the records oldest first, one per line, with the boot they belong
+# to and the time since that program started.
+
+import argparse
+import sys
+
+# Mirrors the constants in trace_log.py, which only imports on a hub.
+MAGIC = 0x7E
+VERSION = 1
+HEADER_SIZE = 8
+RECORD_SIZE = 8
+
+KINDS = {
+    1: "boot",
+    2: "button",
+    3: "mode",
+    4: "battery",
+    5: "exception",
+    6: "overrun",
+    7: "remote",
+}
+BUTTONS = ("LEFT", "LEFT_PLUS", "LEFT_MINUS", "CENTER", "RIGHT", "RIGHT_PLUS", "RIGHT_MINUS")
+MODES = ("drive", "stop")
+BATTERY_STATES = ("ok", "low", "critical")
+EXCEPTIONS = ("Exception", "OSError", "ValueError", "MemoryError", "TypeError", "AttributeError")
+
+
+def read_dump(lines):
+    """Return the raw trace bytes from trace-dump.py output."""
+    data = bytearray()
+    for line in lines:
+        parts = line.split()
+        if len(parts) == 2 and parts[0] == "TRACE":
+            data += bytes.fromhex(parts[1])
+    return bytes(data)
+
+
+def decode(data):
+    """Return the records as (boot, ms, kind, arg, value), oldest first."""
+    if len(data) < HEADER_SIZE or data[0] != MAGIC:
+        raise ValueError("no trace log in dump")
+    if data[1] != VERSION:
+        raise ValueError("unknown trace log version %d" % data[1])
+
+    capacity = (len(data) - HEADER_SIZE) // RECORD_SIZE
+    head = int.from_bytes(data[2:4], "little") % capacity
+    count = min(int.from_bytes(data[4:6], "little"), capacity)
+
+    records = []
+    for i in range(count):
+        slot = (head - count + i) % capacity
+        ofs = HEADER_SIZE + slot * RECORD_SIZE
+        r = data[ofs:ofs + RECORD_SIZE]
+        ms = r[2] | r[3] << 8 | r[4] << 16
+        value = int.from_bytes(r[6:8], "little", signed=True)
+        records.append((r[5], ms, r[0], r[1], value))
+    return records
+
+
+def _name(table, index):
+    return table[index] if index < len(table) else str(index)
+
+
+def describe(kind, arg, value):
+    name = KINDS.get(kind, "kind %d" % kind)
+    if kind == 1:
+        return "%s, battery %d mV" % (name, value)
+    if kind == 2:
+        return "%s %s %s" % (name, _name(BUTTONS, arg), "pressed" if value else "released")
+    if kind == 3:
+        return "%s %s" % (name, _name(MODES, arg))
+    if kind == 4:
+        return "%s %s, %d mV" % (name, _name(BATTERY_STATES, arg), value)
+    if kind == 5:
+        return "%s %s, errno %d" % (name, _name(EXCEPTIONS, arg), value)
+    if kind == 6:
+        return "%s, tick took %d ms" % (name, value)
+    if kind == 7:
+        return "%s %s" % (name, "connected" if value else "lost")
+    return "%s arg %d value %d" % (name, arg, value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode a hub trace log dump.")
+    parser.add_argument("dump", nargs="?", help="output of trace-dump.py (default: stdin)")
+    args = parser.parse_args()
+
+    if args.dump:
+        with open(args.dump) as f:
+            data = read_dump(f)
+    else:
+        data = read_dump(sys.stdin)
+
+    try:
+        records = decode(data)
+    except ValueError as e:
+        sys.exit("trace_decode: %s" % e)
+
+    print("%4s %10s  %s" % ("boot", "ms", "event"))
+    for boot, ms, kind, arg, value in records:
+        print("%4d %10d  %s" % (boot, ms, describe(kind, arg, value)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# Persistent event trace in hub.system.storage, for post-mortem analysis.
+#
+# Without a computer connected, print() output is lost. TraceLog keeps the
+# last events in a ring of fixed-size records right after the hubstore
+# config block, so they survive the program ending (and, if the hub is
+# switched off with its button, a power cycle). Events are buffered in RAM
+# and written in batches at most every FLUSH_MS, so logging costs the loop
+# next to nothing. Read it back with trace-dump.py and decode the output on
+# a computer with trace_decode.py.
+#
+# Region layout (little endian), at TRACE_OFFSET:
+#   0      magic 0x7E
+#   1      layout version
+#   2..3   index of the next record to write
+#   4..5   number of valid records
+#   6      boot counter
+#   7      reserved
+#   8..    records, RECORD_SIZE bytes each:
+#            0      event type
+#            1      argument (button, mode, battery state, exception kind)
+#            2..4   ms since program start, uint24
+#            5      boot counter
+#            6..7   value, int16
+
+from pybricks.parameters import Button
+from pybricks.tools import StopWatch
+
+from hubstore import CONFIG_SIZE
+
+MAGIC = 0x7E
+VERSION = 1
+TRACE_OFFSET = CONFIG_SIZE
+TRACE_SIZE = 448          # fits the 512 byte storage of most hubs
+SMALL_TRACE_SIZE = 64     # fallback for hubs with less storage
+HEADER_SIZE = 8
+RECORD_SIZE = 8
+
+FLUSH_MS = 5000
+MAX_PENDING = 8           # flush early if this many events are waiting
+
+BOOT = 1
+BUTTON = 2
+MODE = 3
+BATTERY = 4
+EXCEPTION = 5
+OVERRUN = 6
+REMOTE = 7
+
+BUTTONS = (Button.LEFT, Button.LEFT_PLUS, Button.LEFT_MINUS, Button.CENTER,
+           Button.RIGHT, Button.RIGHT_PLUS, Button.RIGHT_MINUS)
+
+BATTERY_OK = 0
+BATTERY_LOW = 1
+BATTERY_CRITICAL = 2
+
+BATTERY_MS = 1000         # how often battery() reads the voltage
+
+EXCEPTIONS = (OSError, ValueError, MemoryError, TypeError, AttributeError)
+
+
+class TraceLog:
+    """Ring buffer of compact event records in hub storage."""
+
+    def __init__(self, hub, size=TRACE_SIZE, low_mv=7000, critical_mv=6300):
+        self.hub = hub
+        self.low_mv = low_mv
+        self.critical_mv = critical_mv
+        self.pending = []
+        self.previous = set()
+        self.battery_state = None
+        self._clock = StopWatch()
+        self._flush = StopWatch()
+        self._battery = StopWatch()
+
+        header = self._read_header(size)
+        if header is None:
+            size = SMALL_TRACE_SIZE
+            header = self._read_header(size)
+        self.capacity = (size - HEADER_SIZE) // RECORD_SIZE
+
+        if header and header[0] == MAGIC and header[1] == VERSION:
+            self.head = (header[2] | header[3] << 8) % self.capacity
+            self.count = min(header[4] | header[5] << 8, self.capacity)
+            self.boot = (header[6] + 1) & 0xFF
+        else:
+            self.head = 0
+            self.count = 0
+            self.boot = 0
+
+        self.event(BOOT, 0, hub.battery.voltage())
+        self.flush()
+
+    def _read_header(self, size):
+        try:
+            # Reading the last byte checks the whole region fits.
+            self.hub.system.storage(TRACE_OFFSET + size - 1, read=1)
+            return bytes(self.hub.system.storage(TRACE_OFFSET, read=HEADER_SIZE))
+        except Exception:
+            return None
+
+    def event(self, kind, arg=0, value=0):
+        """Queue one record."""
+        t = self._clock.time() & 0xFFFFFF
+        value &= 0xFFFF
+        self.pending.append(bytes((
+            kind, arg & 0xFF,
+            t & 0xFF, (t >> 8) & 0xFF, t >> 16,
+            self.boot,
+            value & 0xFF, value >> 8,
+        )))
+
+    def buttons(self, pressed):
+        """Record button press and release edges."""
+        if pressed == self.previous:
+            return
+        for i, button in enumerate(BUTTONS):
+            was = button in self.previous
+            now = button in pressed
+            if was != now:
+                self.event(BUTTON, i, 1 if now else 0)
+        self.previous = pressed
+
+    def mode(self, mode):
+        self.event(MODE, mode)
+
+    def battery(self):
+        """Record battery state transitions (ok / low / critical).
+
+        Reads the voltage at most every BATTERY_MS.
+        """
+        if self.battery_state is not None and self._battery.time() < BATTERY_MS:
+            return
+        self._battery.reset()
+        voltage = self.hub.battery.voltage()
+        if voltage < self.critical_mv:
+            state = BATTERY_CRITICAL
+        elif voltage < self.low_mv:
+            state = BATTERY_LOW
+        else:
+            state = BATTERY_OK
+        if state != self.battery_state:
+            self.battery_state = state
+            self.event(BATTERY, state, voltage)
+
+    def overrun(self, tick_ms):
+        self.event(OVERRUN, 0, min(tick_ms, 0x7FFF))
+
+    def exception(self, e):
+        """Record an exception and write everything out right away."""
+        kind = 0
+        for i, cls in enumerate(EXCEPTIONS):
+            if isinstance(e, cls):
+                kind = i + 1
+                break
+        errno = e.args[0] if e.args and isinstance(e.args[0], int) else 0
+        self.event(EXCEPTION, kind, errno)
+        self.flush()
+
+    def update(self):
+        """Write queued records if it is time. Call this every loop tick."""
+        if self.pending and (len(self.pending) >= MAX_PENDING or self._flush.time() >= FLUSH_MS):
+            self.flush()
+
+    def flush(self):
+        """Write all queued records and the header in as few writes as possible."""
+        self._flush.reset()
+        if not self.pending:
+            return
+        records = self.pending[-self.capacity:]
+        self.pending = []
+
+        storage = self.hub.system.storage
+        base = TRACE_OFFSET + HEADER_SIZE
+        while records:
+            # One contiguous write up to the end of the ring.
+            room = self.capacity - self.head
+            chunk = records[:room]
+            records = records[room:]
+            storage(base + self.head * RECORD_SIZE, write=b"".join(chunk))
+            self.head = (self.head + len(chunk)) % self.capacity
+            self.count = min(self.count + len(chunk), self.capacity)
+
+        storage(TRACE_OFFSET, write=bytes((
+            MAGIC, VERSION,
+            self.head & 0xFF, self.head >> 8,
+            self.count & 0xFF, self.count >> 8,
+            self.boot, 0,
+        )))
@@ -1,10 +1,17 @@
 from pybricks.hubs import EssentialHub
-from pybricks.pupdevices import DCMotor, Remote, Light
+from pybricks.pupdevices import DCMotor, Light
 from pybricks.parameters import Port, Button, Color
 from pybricks.tools import wait
 
+from hubstore import HubStore
+from light_fx import LightFx
+from remote_session import RemoteSession
+from throttle import ThrottleShaper
+
 # Initialize the hub.
 hub = EssentialHub()
+store = HubStore(hub)
+store.load()
 
 # Initialize the train motor on Port A.
 train_motor = DCMotor(Port.A)
@@ -22,10 +29,20 @@ except Exception:
     port_c_light = None
     print("Nothing on Port C, continuing without it.")
 
+
+# If the remote drops, the train motor is stopped and it is reconnected.
+def stop_train():
+    """Remote lost: the train stays stopped until it is driven again."""
+    global current_speed
+    current_speed = 0
+    throttle.reset()
+
+
 # Blink yellow while waiting for remote.
 # IMPORTANT: Press the green button on the remote BEFORE running this script!
 hub.light.blink(Color.YELLOW, [500, 500])
-remote = Remote(timeout=10000)
+remote = RemoteSession(store, [train_motor], failsafe=stop_train)
+remote.connect(timeout=10000)
 
 # Connected! Light turns green.
 hub.light.on(Color.GREEN)
@@ -36,14 +53,23 @@ wait(1000)
 speed_step = 10
 current_speed = 0
 
-# Light brightness: 10 steps from 0 to 100.
+# Power actually applied, ramped toward current_speed.
+throttle = ThrottleShaper(hub)
+applied_power = 0
+
+# Light brightness: 10 steps from 0 to 100, in perceived levels. The light
+# engine fades between them; Port B is the headlight going forward and
+# Port C the one going backward.
 brightness_step = 10
 current_brightness = 0
+lights = LightFx()
+front = lights.add(light)
+rear = lights.add(port_c_light)
 
 previous_buttons = set()
 
 while True:
-    pressed = remote.buttons.pressed()
+    pressed = remote.pressed()
     new_presses = pressed - previous_buttons
 
     # Log ALL button presses.
@@ -56,55 +82,49 @@ while True:
         current_speed = 0
         current_brightness = 0
         train_motor.stop()
-        light.off()
-        if port_c_light:
-            port_c_light.off()
+        lights.off()
         print(">>> STOP! Everything off.")
 
     else:
         # LEFT PLUS: accelerate train motor.
         if Button.LEFT_PLUS in new_presses:
             current_speed = min(current_speed + speed_step, 100)
-            train_motor.dc(current_speed)
             print(">>> Motor speed up:", current_speed)
 
         # LEFT MINUS: decelerate train motor.
         if Button.LEFT_MINUS in new_presses:
             current_speed = max(current_speed - speed_step, -100)
-            if current_speed == 0:
-                train_motor.stop()
-            else:
-                train_motor.dc(current_speed)
             print(">>> Motor slow down:", current_speed)
 
         # RIGHT PLUS: increase light brightness.
         if Button.RIGHT_PLUS in new_presses:
             current_brightness = min(current_brightness + brightness_step, 100)
-            light.on(current_brightness)
-            if port_c_light:
-                port_c_light.on(current_brightness)
             print(">>> Light up:", current_brightness)
 
         # RIGHT MINUS: decrease light brightness.
         if Button.RIGHT_MINUS in new_presses:
             current_brightness = max(current_brightness - brightness_step, 0)
-            if current_brightness == 0:
-                light.off()
-                if port_c_light:
-                    port_c_light.off()
-            else:
-                light.on(current_brightness)
-                if port_c_light:
-                    port_c_light.on(current_brightness)
             print(">>> Light down:", current_brightness)
 
+    # Ramp the motor toward the requested speed within the battery's limits.
+    power = throttle.update(current_speed)
+    if power != applied_power:
+        applied_power = power
+        if power == 0:
+            train_motor.stop()
+        else:
+            train_motor.dc(power)
+
+    # Headlight ahead, taillight behind.
+    lights.drive(front, rear, current_speed, current_brightness)
+
     # Remote light shows motor status.
     if current_speed > 0:
-        remote.light.on(Color.GREEN)
+        remote.light(Color.GREEN)
     elif current_speed < 0:
-        remote.light.on(Color.ORANGE)
+        remote.light(Color.ORANGE)
     else:
-        remote.light.on(Color.RED)
+        remote.light(Color.RED)
 
     previous_buttons = pressed
-    wait(100)
\ No newline at end of file
+    lights.idle(100)
\ No newline at end of file
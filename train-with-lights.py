@@ -1,15 +1,27 @@
 from pybricks.hubs import EssentialHub
-from pybricks.pupdevices import DCMotor, Remote, Light
+from pybricks.pupdevices import DCMotor, Light
 from pybricks.parameters import Port, Button, Color
 from pybricks.tools import wait
 
+from hubstore import HubStore
+from energy_profiler import EnergyProfiler
+from light_fx import LightFx
+from remote_session import RemoteSession
+from startup import Startup
+from throttle import ThrottleShaper
+
+startup = Startup()
+
 # Initialize the hub.
 hub = EssentialHub()
+store = HubStore(hub)
+store.load()
 
-# ── Port detection ────────────────────────────────────────────────────────────
-# Hub Logo light pulses YELLOW during the check.
+# ── Port detection and remote scan ────────────────────────────────────────────
+# Both run at the same time. Hub Logo light pulses YELLOW meanwhile.
+# IMPORTANT: Press the green button on the remote BEFORE running this script!
 hub.light.blink(Color.YELLOW, [200, 200])
-print("Checking ports...")
+print("Checking ports and scanning for the remote...")
 
 def try_motor(port):
     try:
@@ -30,8 +42,14 @@ def try_light(port):
         print("No light on", port)
         return None
 
-# Port A: train motor (required).
-train_motor = try_motor(Port.A)
+# Port A: train motor (required). Port B: front light (optional).
+startup.run(
+    startup.device("motor", try_motor, Port.A, required=True),
+    startup.device("front light", try_light, Port.B),
+    startup.remote(store, timeout=10000),
+)
+
+train_motor = startup.devices["motor"]
 if train_motor is None:
     # Logo light turns RED — motor missing, cannot run.
     hub.light.on(Color.RED)
@@ -39,23 +57,26 @@ if train_motor is None:
     wait(5000)
     hub.system.shutdown()
 
-# Port B: front light (optional).
-front_light = try_light(Port.B)
+front_light = startup.devices["front light"]
 
 # Essential Hub only has ports A and B — no Port C.
 rear_light = None
 
-print("Port check complete.")
+# If the remote drops later, the train motor is stopped and it is reconnected.
+def stop_train():
+    """Remote lost: the train stays stopped until it is driven again."""
+    global current_speed
+    current_speed = 0
+    throttle.reset()
 
-# ── Wait for remote ───────────────────────────────────────────────────────────
-# IMPORTANT: Press the green button on the remote BEFORE running this script!
-hub.light.blink(Color.YELLOW, [500, 500])
-remote = Remote(timeout=10000)
 
-# Connected — Logo light turns GREEN briefly.
+remote = RemoteSession(store, [train_motor], failsafe=stop_train,
+                       remote=startup.devices["remote"])
+
+# Connected — Logo light turns GREEN, then follows the motor direction.
 hub.light.on(Color.GREEN)
-print("Remote connected!")
-wait(1000)
+store.save()
+print("Remote connected! Time to first drive:", startup.clock.time(), "ms")
 
 # ── State ─────────────────────────────────────────────────────────────────────
 SPEED_STEP = 10
@@ -65,19 +86,18 @@ current_speed = 0
 current_brightness = 0
 previous_buttons = set()
 
+# Power actually applied, ramped toward current_speed.
+throttle = ThrottleShaper(hub)
+applied_power = 0
 
-def set_lights(brightness):
-    """Apply brightness to all connected lights."""
-    if front_light:
-        if brightness == 0:
-            front_light.off()
-        else:
-            front_light.on(brightness)
-    if rear_light:
-        if brightness == 0:
-            rear_light.off()
-        else:
-            rear_light.on(brightness)
+# Battery energy per actuator and per speed, printed every minute.
+energy = EnergyProfiler(hub)
+
+# Lights fade between levels and dim to taillights behind the train. The
+# effects run while the loop waits, so button handling only sets targets.
+lights = LightFx()
+front = lights.add(front_light)
+rear = lights.add(rear_light)
 
 
 def update_logo_light(speed):
@@ -96,7 +116,7 @@ def update_logo_light(speed):
 
 # ── Main loop ─────────────────────────────────────────────────────────────────
 while True:
-    pressed = remote.buttons.pressed()
+    pressed = remote.pressed()
     new_presses = pressed - previous_buttons
 
     if new_presses:
@@ -109,45 +129,56 @@ while True:
         current_speed = 0
         current_brightness = 0
         train_motor.stop()
-        set_lights(0)
+        lights.off()
         print("STOP — everything off.")
 
     else:
         # LEFT PLUS: speed up.
         if Button.LEFT_PLUS in new_presses:
             current_speed = min(current_speed + SPEED_STEP, 100)
-            train_motor.dc(current_speed)
             print("Speed up:", current_speed)
 
         # LEFT MINUS: slow down / reverse.
         if Button.LEFT_MINUS in new_presses:
             current_speed = max(current_speed - SPEED_STEP, -100)
-            if current_speed == 0:
-                train_motor.stop()
-            else:
-                train_motor.dc(current_speed)
             print("Speed down:", current_speed)
 
         # RIGHT PLUS: brighter lights.
         if Button.RIGHT_PLUS in new_presses:
             current_brightness = min(current_brightness + BRIGHTNESS_STEP, 100)
-            set_lights(current_brightness)
             print("Light up:", current_brightness)
 
         # RIGHT MINUS: dimmer lights.
         if Button.RIGHT_MINUS in new_presses:
             current_brightness = max(current_brightness - BRIGHTNESS_STEP, 0)
-            set_lights(current_brightness)
             print("Light down:", current_brightness)
 
+    # Ramp the motor toward the requested speed within the battery's limits.
+    power = throttle.update(current_speed)
+    if power != applied_power:
+        applied_power = power
+        if power == 0:
+            train_motor.stop()
+        else:
+            train_motor.dc(power)
+
+    # Headlight ahead, taillight behind, faded by the light engine.
+    lights.drive(front, rear, current_speed, current_brightness)
+
     # Remote light shows speed direction; hub Logo light mirrors it too.
     update_logo_light(current_speed)
     if current_speed > 0:
-        remote.light.on(Color.GREEN)
+        remote.light(Color.GREEN)
     elif current_speed < 0:
-        remote.light.on(Color.ORANGE)
+        remote.light(Color.ORANGE)
     else:
-        remote.light.on(Color.RED)
+        remote.light(Color.RED)
+
+    # Energy accounting: motor and lights, with the speed step as the mode.
+    energy.set("motor", applied_power != 0)
+    energy.set("lights", current_brightness > 0)
+    energy.mode("speed " + str(abs(current_speed)))
+    energy.update()
 
     previous_buttons = pressed
-    wait(100)
+    lights.idle(100)
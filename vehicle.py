@@ -0,0 +1,414 @@
+# Generic remote-control engine driven by vehicle profiles (see profiles.py).
+#
+# A profile describes one vehicle: which motors sit on which ports, which
+# remote buttons drive them, which accessories are fitted and the battery
+# thresholds. Vehicle compiles a profile once at startup into flat tables of
+# (button, setpoints) per channel, so each tick is a few tuple lookups and
+# motors are only written when their command actually changes.
+#
+# Channel modes:
+#   RUN       motor.run(speed) while pressed, stop() on release
+#   DC        motor.dc(duty) while pressed, dc(0) on release
+#   TARGET    run_target(speed, angle) while pressed, back to 0 on release
+#   CENTER    run(speed) while pressed, run_target(speed, 0) on release
+#   CAR_DRIVE Car.drive_power(power), 0 on release, ramped by a ThrottleShaper
+#   CAR_STEER Car.steer(percentage), 0 on release
+
+from pybricks.parameters import Button, Color, Stop
+from pybricks.pupdevices import Motor
+from pybricks.tools import wait, StopWatch
+
+from hubstore import center_steering
+from motor_group import MotorGroup
+from remote_session import RemoteSession
+from throttle import ThrottleShaper
+from trace_log import MODE, REMOTE
+
+RUN = 0
+DC = 1
+TARGET = 2
+CENTER = 3
+CAR_DRIVE = 4
+CAR_STEER = 5
+
+SELECT_WINDOW_MS = 3000
+
+# Modes recorded in the trace log.
+MODE_DRIVE = 0
+MODE_STOP = 1
+
+
+def detect_hub():
+    """Return (hub, class name) for the hub this program runs on."""
+    import pybricks.hubs as hubs
+
+    for name in ("TechnicHub", "MoveHub", "EssentialHub", "CityHub"):
+        try:
+            return getattr(hubs, name)(), name
+        except Exception:
+            pass
+    raise OSError("No hub detected")
+
+
+def select_profile(hub, hub_name, profiles, store):
+    """Pick a profile for this hub, from the store or with the hub button.
+
+    The hub light shows the color of the current choice for SELECT_WINDOW_MS.
+    Each press of the hub button moves to the next profile and restarts the
+    window. The choice is remembered, so the next boot starts with it.
+    """
+    choices = [i for i, p in enumerate(profiles) if p["hub"] == hub_name]
+    if not choices:
+        raise ValueError("No profile for " + hub_name)
+
+    pos = choices.index(store.profile) if store.profile in choices else 0
+
+    if len(choices) > 1:
+        hub.system.set_stop_button(None)
+        hub.light.on(profiles[choices[pos]]["color"])
+        timer = StopWatch()
+        was_pressed = True  # ignore the press that started the program
+        while timer.time() < SELECT_WINDOW_MS:
+            is_pressed = Button.CENTER in hub.buttons.pressed()
+            if is_pressed and not was_pressed:
+                pos = (pos + 1) % len(choices)
+                hub.light.on(profiles[choices[pos]]["color"])
+                timer.reset()
+            was_pressed = is_pressed
+            wait(20)
+        hub.system.set_stop_button(Button.CENTER)
+
+    if store.profile != choices[pos]:
+        store.profile = choices[pos]
+        store.dirty = True
+
+    profile = profiles[choices[pos]]
+    print("Profile:", profile["name"])
+    return profile
+
+
+class _Channel:
+    """One compiled button table driving one or more motors."""
+
+    def __init__(self, mode, motors, table, speed, shaper=None):
+        self.mode = mode
+        self.motors = motors
+        self.table = table
+        self.speed = speed
+        self.shaper = shaper
+        self.group = MotorGroup(motors) if mode in (RUN, DC) else None
+        self.idle = (0,) * len(motors)
+        self.last = None
+
+    def reset(self):
+        self.last = None
+        if self.shaper:
+            self.shaper.reset()
+        if self.group:
+            self.group.invalidate()
+
+    def update(self, pressed):
+        values = None
+        for button, setpoints in self.table:
+            if button in pressed:
+                values = setpoints
+                break
+
+        if self.shaper:
+            # Ramped channel: the output changes while the button is held.
+            power = self.shaper.update(values[0] if values else 0)
+            if power != self.last:
+                self.last = power
+                self.motors[0].drive_power(power)
+            return
+
+        if values is self.last:
+            return
+        self.last = values
+
+        mode = self.mode
+        if mode == RUN:
+            if values:
+                self.group.run(values)
+            else:
+                self.group.stop()
+            return
+        if mode == DC:
+            self.group.dc(values or self.idle)
+            return
+
+        for i, motor in enumerate(self.motors):
+            if mode == TARGET:
+                motor.run_target(self.speed, values[i] if values else 0, then=Stop.HOLD, wait=False)
+            elif mode == CENTER:
+                if values:
+                    motor.run(values[i])
+                else:
+                    motor.run_target(self.speed, 0, then=Stop.HOLD, wait=False)
+            elif mode == CAR_DRIVE:
+                motor.drive_power(values[i] if values else 0)
+            elif mode == CAR_STEER:
+                motor.steer(values[i] if values else 0)
+
+
+def _lookup(table, pressed):
+    for button, value in table:
+        if button is None or button in pressed:
+            return value
+    return None
+
+
+class AnyButtonLight:
+    """Light on a port that is on while any remote button is pressed."""
+
+    def __init__(self, vehicle, port):
+        from pybricks.pupdevices import Light
+
+        self.light = Light(port)
+        self.on = None
+
+    def update(self, pressed, new_presses):
+        on = bool(pressed)
+        if on != self.on:
+            self.on = on
+            if on:
+                self.light.on(100)
+            else:
+                self.light.off()
+
+
+class BatteryLight:
+    """Hub light shows battery state: green OK, yellow low, off after warning."""
+
+    def __init__(self, vehicle, low_mv, check_ms, warn_ms):
+        self.hub = vehicle.hub
+        self.low_mv = low_mv
+        self.check_ms = check_ms
+        self.warn_ms = warn_ms
+        self.low_timer = 0
+        self.check = StopWatch()
+
+    def update(self, pressed, new_presses):
+        if self.check.time() < self.check_ms:
+            return
+        self.check.reset()
+
+        if self.hub.battery.voltage() >= self.low_mv:
+            self.hub.light.on(Color.GREEN)
+            self.low_timer = 0
+        else:
+            self.low_timer += self.check_ms
+            if self.low_timer <= self.warn_ms:
+                self.hub.light.on(Color.YELLOW)
+            else:
+                self.hub.light.off()
+
+
+class MatrixLight:
+    """ColorLightMatrix with toggled green/white modes and low battery warning.
+
+    LEFT toggles a blinking green battery gauge, RIGHT toggles white. Below
+    warning_mv the matrix shows yellow for warn_ms, then restores the modes.
+    """
+
+    def __init__(self, vehicle, port, warning_mv, warn_ms):
+        from pybricks.pupdevices import ColorLightMatrix
+
+        self.hub = vehicle.hub
+        self.matrix = ColorLightMatrix(port)
+        self.warning_mv = warning_mv
+        self.warn_ms = warn_ms
+        self.blink = False
+        self.green_on = False
+        self.white_on = False
+        self.warning = None
+        self.saved = None
+
+    def update(self, pressed, new_presses):
+        if self.warning is None:
+            if Button.LEFT in new_presses:
+                self.green_on = not self.green_on
+            elif Button.RIGHT in new_presses:
+                self.white_on = not self.white_on
+
+        voltage = self.hub.battery.voltage()
+        if self.warning is None and voltage < self.warning_mv:
+            self.warning = StopWatch()
+            self.saved = (self.green_on, self.white_on)
+
+        if self.warning is not None:
+            if self.warning.time() >= self.warn_ms:
+                self.warning = None
+                self.green_on, self.white_on = self.saved
+            elif self.saved[0] or self.saved[1]:
+                self.matrix.on([Color.YELLOW] + [Color.NONE] * 8)
+            else:
+                self.matrix.on(Color.YELLOW)
+        elif self.white_on:
+            self.matrix.on(Color.WHITE)
+        elif self.green_on:
+            self.blink = not self.blink
+            if self.blink:
+                self.matrix.on(Color.GREEN if voltage > 7500 else Color.YELLOW if voltage > 6500 else Color.RED)
+            else:
+                self.matrix.off()
+        else:
+            self.matrix.off()
+
+
+ACCESSORIES = {
+    "light": AnyButtonLight,
+    "battery_light": BatteryLight,
+    "matrix": MatrixLight,
+}
+
+
+class Vehicle:
+    """Runs one vehicle profile."""
+
+    def __init__(self, hub, store, profile, trace=None):
+        self.hub = hub
+        self.store = store
+        self.profile = profile
+        self.trace = trace
+        self.tick_ms = profile.get("tick", 50)
+        self.stop_button = profile.get("stop")
+        self.quit_button = profile.get("quit")
+        self.hub_light = profile.get("hub_light", ())
+        self.remote_light = profile.get("remote_light", ())
+
+        # Motors by name. Optional motors that are missing are left out,
+        # together with every channel that uses them.
+        devices = {}
+        for name, port, direction, optional in profile["motors"]:
+            try:
+                devices[name] = Motor(port, direction)
+            except OSError:
+                if not optional:
+                    raise
+                print("No", name, "motor, continuing without it")
+        self.motors = list(devices.values())
+
+        for name in profile.get("center", ()):
+            if name in devices:
+                center_steering(devices[name], store)
+
+        if "car" in profile:
+            from pybricks.robotics import Car
+
+            steer_name, drive_names = profile["car"]
+            devices["car"] = Car(devices[steer_name], [devices[n] for n in drive_names])
+
+        self.channels = []
+        for names, mode, table, speed in profile["channels"]:
+            if all(n in devices for n in names):
+                motors = tuple(devices[n] for n in names)
+                shaper = ThrottleShaper(hub) if mode == CAR_DRIVE else None
+                self.channels.append(_Channel(mode, motors, tuple(table), speed, shaper))
+
+        self.accessories = [
+            ACCESSORIES[spec[0]](self, *spec[1:]) for spec in profile.get("accessories", ())
+        ]
+
+        self.remote = RemoteSession(store, self.motors, failsafe=self._reset_channels)
+
+    def _reset_channels(self):
+        for channel in self.channels:
+            channel.reset()
+
+    def emergency_stop(self):
+        for motor in self.motors:
+            motor.stop()
+        self._reset_channels()
+        self.hub.light.on(Color.RED)
+        self.remote.light(Color.RED)
+
+    def run(self, boot=None):
+        self.hub.light.on(Color.ORANGE)
+        self.remote.connect()
+        self.hub.light.on(Color.GREEN)
+        self.store.save()
+        if boot:
+            print("Time to first drive:", boot.time(), "ms")
+
+        if not self.trace:
+            self._loop()
+            return
+        try:
+            self._loop()
+        except Exception as e:
+            self.trace.exception(e)
+            raise
+        finally:
+            # Also reached when the stop button ends the program.
+            self.trace.flush()
+
+    def _loop(self):
+        trace = self.trace
+        tick = StopWatch()
+        hub_color = None
+        remote_color = None
+        previous = set()
+        mode = MODE_DRIVE
+        connected = True
+
+        while True:
+            tick.reset()
+            pressed = self.remote.pressed()
+            new_presses = pressed - previous
+            previous = pressed
+
+            if trace:
+                trace.buttons(pressed)
+                trace.battery()
+                if self.remote.connected != connected:
+                    connected = self.remote.connected
+                    trace.event(REMOTE, 1 if connected else 0)
+
+            if self.quit_button in pressed:
+                self.hub.light.off()
+                break
+
+            if self.stop_button in pressed:
+                if mode != MODE_STOP:
+                    mode = MODE_STOP
+                    if trace:
+                        trace.event(MODE, mode)
+                self.emergency_stop()
+                hub_color = remote_color = Color.RED
+                wait(self.tick_ms)
+                continue
+
+            if mode != MODE_DRIVE:
+                mode = MODE_DRIVE
+                if trace:
+                    trace.event(MODE, mode)
+
+            for channel in self.channels:
+                channel.update(pressed)
+
+            for accessory in self.accessories:
+                accessory.update(pressed, new_presses)
+
+            if self.hub_light:
+                color = Color.ORANGE if not self.remote.connected else _lookup(self.hub_light, pressed)
+                if color != hub_color:
+                    hub_color = color
+                    self.hub.light.on(color)
+
+            if not self.remote.connected:
+                remote_color = None
+            elif self.remote_light:
+                color = _lookup(self.remote_light, pressed)
+                if color != remote_color:
+                    remote_color = color
+                    self.remote.light(color)
+
+            if trace:
+                # The work of one tick should fit well inside the tick.
+                busy = tick.time()
+                if busy > self.tick_ms:
+                    trace.overrun(busy)
+                trace.update()
+
+            wait(self.tick_ms)
@@ -0,0 +1,102 @@
+# Loop deadline watchdog.
+#
+# The control loop calls beat() once per tick. A separate task, watch(),
+# checks every CHECK_MS how long ago the last beat was. Once that is more
+# than the deadline, every registered motor is stopped and failsafe() is
+# called, so nothing keeps running on a stale command such as dc(-100).
+# When the loop beats again it is back in charge and the watchdog rearms.
+#
+# run() starts the loop and the watchdog side by side. The watchdog only
+# gets a turn while the loop awaits something, so it only protects loops
+# whose slow calls are awaited (sensor reads, remote light, drive base
+# moves): a miss during such a call is acted on at most CHECK_MS late. A
+# synchronous call that blocks stops the watchdog too, and the loop beats
+# again before the watchdog runs, so such a stall is never caught. It only
+# shows up in the statistics below. Loops without awaited slow calls gain
+# nothing from the watchdog.
+#
+# For tuning, beat() also keeps the number of ticks longer than the
+# deadline (overruns) and the longest tick (worst_ms). They are printed
+# with report() after every overrun and trip, and every REPORT_MS.
+
+from pybricks.tools import wait, StopWatch, multitask, run_task
+
+DEADLINE_MS = 200
+CHECK_MS = 10
+REPORT_MS = 60000
+
+
+class LoopWatchdog:
+    """Stops registered motors when the control loop misses its deadline."""
+
+    def __init__(self, deadline_ms=DEADLINE_MS, check_ms=CHECK_MS, failsafe=None,
+                 report_ms=REPORT_MS):
+        self.deadline_ms = deadline_ms
+        self.check_ms = check_ms
+        self.report_ms = report_ms
+        self.failsafe = failsafe
+        self.motors = []
+        self.overruns = 0
+        self.trips = 0
+        self.worst_ms = 0
+        self.max_latency_ms = 0
+        self.armed = False
+        self.tripped = False
+        self._since = StopWatch()
+        self._report = StopWatch()
+
+    def register(self, *motors):
+        """Add motors to stop on a missed deadline."""
+        for motor in motors:
+            if motor is not None and motor not in self.motors:
+                self.motors.append(motor)
+
+    def beat(self):
+        """Call once per loop tick."""
+        tick = self._since.time()
+        self._since.reset()
+        if not self.armed:
+            # The first beat only starts the clock; setup time is no tick.
+            self.armed = True
+            return
+        if tick > self.worst_ms:
+            self.worst_ms = tick
+        if self.tripped:
+            self.tripped = False
+            print("Watchdog: loop back after", tick, "ms")
+        if tick > self.deadline_ms:
+            self.overruns += 1
+            self.report()
+        elif self.report_ms and self._report.time() >= self.report_ms:
+            self.report()
+
+    def stop_all(self):
+        for motor in self.motors:
+            motor.stop()
+        if self.failsafe:
+            self.failsafe()
+
+    async def watch(self):
+        """Watchdog task; runs until the program ends."""
+        while True:
+            await wait(self.check_ms)
+            if not self.armed or self.tripped:
+                continue
+            late = self._since.time() - self.deadline_ms
+            if late > 0:
+                self.stop_all()
+                self.tripped = True
+                self.trips += 1
+                if late > self.max_latency_ms:
+                    self.max_latency_ms = late
+                print("Watchdog: no beat for", self.deadline_ms + late, "ms, motors stopped")
+                self.report()
+
+    def report(self):
+        self._report.reset()
+        print("Watchdog:", self.overruns, "overruns,", self.trips, "trips, worst tick",
+              self.worst_ms, "ms, worst stop latency", self.max_latency_ms, "ms")
+
+    def run(self, loop):
+        """Run the loop coroutine under the watchdog until the loop returns."""
+        run_task(multitask(loop, self.watch(), race=True))